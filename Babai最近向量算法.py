@@ -7,6 +7,9 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
 
+from 格基约简 import gram_schmidt_qr, parse_number
+from 最近向量求解 import BabaiSolver, CVPSolver
+
 # 设置 matplotlib 支持中文
 plt.rcParams['font.sans-serif'] = ['SimHei']  # 使用黑体字体，根据系统情况可更换
 plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
@@ -14,8 +17,20 @@ plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
 
 
 class Vector:
+    """一维浮点数组的薄视图，仅供GUI显示与绘图：data直接引用传入的数组（已是float数组时不复制）
+
+    核心计算（gram_schmidt、babai_closest_vector、最近向量求解.py）都直接使用二维格基数组
+    """
+    __slots__ = ("data",)
+
     def __init__(self, data):
-        self.data = np.array(data, dtype=float)
+        self.data = np.asarray(data, dtype=float)
+
+    def __array__(self, dtype=None, copy=None):
+        """copy为真时返回副本（np.array(v)不能改到调用方的数组），否则尽量返回视图"""
+        if copy:
+            return self.data.astype(dtype or self.data.dtype, copy=True)
+        return self.data if dtype is None else self.data.astype(dtype, copy=False)
 
     def __add__(self, other):
         return Vector(self.data + other.data)
@@ -39,37 +54,31 @@ class Vector:
         return f"Vector({self.data.round(4).tolist()})"
 
 
+def _as_matrix(basis):
+    """二维格基数组原样使用（不复制）；Vector列表按行堆叠"""
+    if isinstance(basis, np.ndarray) and basis.dtype == np.float64:
+        return basis
+    return np.array([np.asarray(b, dtype=float) for b in basis])
+
+
 def gram_schmidt(basis):
-    ortho_basis = []
-    mu = np.zeros((len(basis), len(basis)))
-
-    for i in range(len(basis)):
-        v_i = basis[i].data.copy()
-        for j in range(i):
-            mu[i][j] = basis[i].dot(ortho_basis[j]) / ortho_basis[j].dot(ortho_basis[j])
-            v_i -= mu[i][j] * ortho_basis[j].data
-        ortho_basis.append(Vector(v_i))
+    """Gram-Schmidt正交化（一次QR），返回 (正交化后的二维数组，每行一个b*_i, μ)"""
+    ortho_basis, mu, _ = gram_schmidt_qr(_as_matrix(basis))
     return ortho_basis, mu
 
 
 def babai_closest_vector(basis, target):
-    ortho_basis, mu = gram_schmidt(basis)
-    n = len(basis)
-    t = target.data.copy()
-    a = np.zeros(n, dtype=float)
-
-    for i in reversed(range(n)):
-        a[i] = round(t.dot(ortho_basis[i].data) / ortho_basis[i].dot(ortho_basis[i]))
-        for j in range(i):
-            t[j] -= a[i] * mu[i][j]
+    """单个目标的Babai最近平面解码：closest = a @ B一次得到（多个目标请直接使用BabaiSolver，只预计算一次）
 
-    closest = Vector(np.zeros_like(target.data))
-    for i in range(n):
-        closest += a[i] * basis[i]
-    return closest
+    basis为二维数组（每行一个基向量）或Vector列表，target为一维数组或Vector；返回最近格向量的Vector视图
+    """
+    solver = BabaiSolver(_as_matrix(basis))
+    return Vector(solver.solve(np.asarray(target, dtype=float)))
 
 
 class BabaiGUI:
+    MODES = {"最近平面": "nearest_plane", "取整": "rounding", "枚举（精确）": "enumerate", "Kannan嵌入": "embedding"}
+
     def __init__(self, root):
         self.root = root
         self.root.title("Babai最近向量算法可视化")
@@ -111,9 +120,16 @@ class BabaiGUI:
         self.target_frame = ttk.Frame(control_frame)
         self.target_frame.grid(row=2, column=1, columnspan=2)
 
+        # 解码模式与LLL预约简（取整最快，最近平面更准；约简后的格基两者都更准）
+        self.mode_var = tk.StringVar(value="最近平面")
+        ttk.Combobox(control_frame, textvariable=self.mode_var, values=list(self.MODES), width=8,
+                     state="readonly").grid(row=3, column=0)
+        self.reduce_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(control_frame, text="先LLL约简", variable=self.reduce_var).grid(row=3, column=1, columnspan=2)
+
         # 操作按钮
-        ttk.Button(control_frame, text="计算最近向量", command=self.calculate).grid(row=3, column=0, pady=10)
-        ttk.Button(control_frame, text="重置", command=self.reset).grid(row=3, column=1)
+        ttk.Button(control_frame, text="计算最近向量", command=self.calculate).grid(row=4, column=0, pady=10)
+        ttk.Button(control_frame, text="重置", command=self.reset).grid(row=4, column=1)
 
         self.update_dimension()
 
@@ -391,22 +407,25 @@ class BabaiGUI:
         """执行Babai算法计算"""
         try:
             # 解析输入
-            basis = []
-            for entries in self.basis_entries:
-                vec = [float(entry.get()) for entry in entries]
-                basis.append(Vector(vec))
-
-            target = Vector([float(entry.get()) for entry in self.target_entries])
+            # 整数格基保持整数（大整数不丢失精度），由CVPSolver只把约简结果转为浮点
+            basis = np.array([[parse_number(entry.get()) for entry in entries] for entries in self.basis_entries])
+            target = np.array([float(entry.get()) for entry in self.target_entries])
 
             # 执行算法
-            self.closest_vector = babai_closest_vector(basis, target)
-            self.target_vector = target.data
+            solver = CVPSolver(basis, reduce=self.reduce_var.get())
+            result = solver.solve(target, self.MODES[self.mode_var.get()])
+            self.closest_vector = Vector(result.vector)  # 视图，不复制
+            self.target_vector = target
 
             # 更新结果展示
             self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, f"目标向量: {target.data}\n")
+            self.result_text.insert(tk.END, f"目标向量: {target}\n")
             self.result_text.insert(tk.END, f"最近格向量: {self.closest_vector.data}\n")
-            self.result_text.insert(tk.END, f"欧氏距离: {np.linalg.norm(target.data - self.closest_vector.data):.4f}")
+            self.result_text.insert(tk.END, f"系数: {result.coefficients}\n")
+            self.result_text.insert(tk.END, f"模式: {self.mode_var.get()}"
+                                            f"{'（LLL约简后）' if result.reduced else ''}"
+                                            f"{f'，枚举节点 {result.nodes}' if result.nodes is not None else ''}\n")
+            self.result_text.insert(tk.END, f"欧氏距离: {result.distance:.4f}")
 
             # 更新可视化
             self.update_visualization()
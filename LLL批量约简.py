@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from 格基约简 import bkz_reduce, deep_lll_reduce, hadamard_ratio, lll_reduce, lll_reduce_exact, parse_number
+
+MODES = ("float", "exact", "bkz", "deep")
+SUFFIXES = (".txt", ".json", ".jsonl", ".npy")
+
+
+def read_bases(path):
+    """读取一个文件中的全部格基，返回 [(编号, 格基行列表), ...]
+
+    .txt：每行一个格基行向量（空白分隔），格基之间用空行分隔
+    .json：一个格基（二维列表）或格基列表
+    .jsonl：每行一个格基，或 {"id": ..., "basis": [[...], ...]}
+    .npy：二维数组为一个格基，三维数组为多个格基
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".npy":
+        array = np.load(path, allow_pickle=False)
+        bases = [array] if array.ndim == 2 else list(array)
+        return [(i, basis.tolist()) for i, basis in enumerate(bases)]
+
+    with open(path, encoding="utf-8") as f:
+        if suffix == ".json":
+            data = json.load(f)
+            bases = [data] if data and not isinstance(data[0][0], list) else data
+            return list(enumerate(bases))
+        if suffix == ".jsonl":
+            bases = []
+            for i, line in enumerate(f):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    bases.append((record.get("id", i), record["basis"]))
+                else:
+                    bases.append((i, record))
+            return bases
+
+        bases = [[]]
+        for line in f:
+            if line.strip():
+                bases[-1].append([parse_number(x) for x in line.split()])
+            elif bases[-1]:
+                bases.append([])
+        return [(i, basis) for i, basis in enumerate(bases) if basis]
+
+
+def collect_files(paths):
+    """展开命令行给出的文件与目录（目录中按文件名排序读取支持的格式）"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += [os.path.join(path, name) for name in sorted(os.listdir(path))
+                      if os.path.splitext(name)[1].lower() in SUFFIXES]
+        else:
+            files.append(path)
+    return files
+
+
+def _to_json_number(x):
+    """整数值输出为JSON整数（精确模式的大整数不丢失精度），其余按浮点输出"""
+    if isinstance(x, (int, np.integer)) or float(x).is_integer():
+        return int(x)
+    return float(x)
+
+
+def reduce_task(task):
+    """在子进程中约简一个格基，返回一条JSON结果记录（出错时记录错误信息而不中断整批）"""
+    source, index, basis, mode, delta, block_size = task
+    record = {"source": source, "id": index, "dim": None, "mode": mode}
+    try:
+        record["dim"] = len(basis)
+        B = np.array(basis, dtype=object)  # 整数保持原样，由约简函数选择int64或大整数存储
+        if B.ndim != 2 or not all(isinstance(x, (int, float, np.number)) and not isinstance(x, bool)
+                                  for x in B.ravel()):
+            raise ValueError("格基必须是由数字组成的二维矩阵")
+        record["hadamard_before"] = hadamard_ratio(B)
+        start = time.perf_counter()
+        if mode == "exact":
+            reduced, swaps = lll_reduce_exact(B, delta)
+            status = None
+        elif mode == "bkz":
+            reduced, status = bkz_reduce(B, block_size, delta)
+        elif mode == "deep":
+            reduced, status = deep_lll_reduce(B, delta)
+        else:
+            reduced, status = lll_reduce(B, delta)
+        record["time"] = time.perf_counter() - start
+        record["swaps"] = status.swaps if status is not None else swaps
+        record["reduced"] = status.reduced if status is not None else True
+        if status is not None and not status.reduced:
+            record["reason"] = status.reason
+        record["hadamard_after"] = hadamard_ratio(reduced)
+        record["basis"] = [[_to_json_number(x) for x in row] for row in reduced]
+    except Exception as e:  # 任何异常都只记入本条结果，不能经executor.map中断整批
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量LLL格基约简：读取格基文件，并行约简后输出JSON行")
+    parser.add_argument("inputs", nargs="+", help="格基文件或目录（.txt / .json / .jsonl / .npy）")
+    parser.add_argument("-o", "--output", help="输出的JSON行文件（默认标准输出）")
+    parser.add_argument("-m", "--mode", choices=MODES, default="float", help="约简算法（默认float；大整数格基用exact）")
+    parser.add_argument("-d", "--delta", type=float, default=0.99, help="Lovász参数δ（默认0.99）")
+    parser.add_argument("-b", "--block-size", type=int, default=10, help="BKZ块大小（默认10）")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="进程数（默认CPU核数）")
+    args = parser.parse_args(argv)
+
+    tasks = []
+    unreadable = []  # 无法解析的文件各输出一条错误记录，不影响其他文件
+    for path in collect_files(args.inputs):
+        try:
+            bases = read_bases(path)
+        except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+            unreadable.append({"source": path, "error": f"{type(e).__name__}: {e}"})
+            continue
+        tasks += [(path, index, basis, args.mode, args.delta, args.block_size) for index, basis in bases]
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    failed = len(unreadable)
+    try:
+        for record in unreadable:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        with ProcessPoolExecutor(args.workers) as executor:
+            for record in executor.map(reduce_task, tasks, chunksize=max(1, len(tasks) // (4 * args.workers))):
+                failed += "error" in record
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"共约简 {len(tasks)} 个格基，失败 {failed} 个（其中无法读取的文件 {len(unreadable)} 个）", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
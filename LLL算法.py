@@ -1,16 +1,28 @@
 import numpy as np
 import tkinter as tk
 from tkinter import messagebox, scrolledtext #tkinter 的子模块，分别用于显示消息框和滚动文本框
+import os
+import threading
 import time
+from 格基约简 import (ReductionStats, basis_quality, bkz_reduce, deep_lll_reduce, gram_schmidt_qr, hadamard_ratio,
+                  is_lll_reduced, lll_reduce, lll_reduce_exact, parse_number, segment_lll_reduce)
 
 
 class LLLGUI:
+    MODES = {"浮点": "float", "精确整数": "exact", "BKZ": "bkz", "深插入LLL": "deep", "分段并行LLL": "segment"}
+
     def __init__(self, master):
         self.master = master
         master.title("LLL格基约简计算器")
         master.geometry("1000x700")
         self.swap_count = 0  # 新增交换次数计数器
+        self.status = None  # 浮点模式的约简状态（LLLStatus）
+        self.stats = None  # 浮点/BKZ/深插入模式的热路径统计（ReductionStats）
         self.input_entries = []  # 用于存储输入框
+        self.worker = None  # 后台约简线程
+        self.cancel_event = threading.Event()
+        self.progress_info = None  # 后台线程报告的最新进度 (k, 交换次数, log D)
+        self.result = None  # 后台线程的结果 (约简后的格基, 耗时, 异常)
         self.create_widgets()
 
     def create_widgets(self):
@@ -33,6 +45,22 @@ class LLLGUI:
         self.calc_btn.pack(side=tk.LEFT, padx=5)
         self.clear_btn = tk.Button(button_frame, text="清空输入", command=self.clear_input)
         self.clear_btn.pack(side=tk.LEFT, padx=5)
+        self.cancel_btn = tk.Button(button_frame, text="取消计算", command=self.cancel_calculation, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
+        tk.Label(button_frame, text="约简模式:").pack(side=tk.LEFT, padx=5)
+        self.mode_var = tk.StringVar(value="浮点")  # 大整数格基使用精确整数模式
+        tk.OptionMenu(button_frame, self.mode_var, *self.MODES).pack(side=tk.LEFT, padx=5)
+        tk.Label(button_frame, text="BKZ块大小:").pack(side=tk.LEFT, padx=5)
+        self.block_entry = tk.Entry(button_frame, width=5)
+        self.block_entry.insert(0, "10")
+        self.block_entry.pack(side=tk.LEFT, padx=5)
+        tk.Label(button_frame, text="插入深度(空=不限):").pack(side=tk.LEFT, padx=5)
+        self.depth_entry = tk.Entry(button_frame, width=5)
+        self.depth_entry.pack(side=tk.LEFT, padx=5)
+        tk.Label(button_frame, text="进程数:").pack(side=tk.LEFT, padx=5)
+        self.workers_entry = tk.Entry(button_frame, width=5)
+        self.workers_entry.insert(0, str(os.cpu_count() or 1))
+        self.workers_entry.pack(side=tk.LEFT, padx=5)
 
         # 输出区域
         output_frame = tk.LabelFrame(self.master, text="计算结果")
@@ -49,108 +77,47 @@ class LLLGUI:
         self.swap_label.pack(side=tk.LEFT, padx=10)
         self.time_label = tk.Label(self.ratio_frame, text="计算时间：")
         self.time_label.pack(side=tk.RIGHT, padx=10)
+        self.progress_label = tk.Label(self.ratio_frame, text="")
+        self.progress_label.pack(side=tk.RIGHT, padx=10)
 
         self.result_text = scrolledtext.ScrolledText(output_frame, height=15)
         self.result_text.pack(padx=5, pady=5, fill=tk.BOTH, expand=True)
 
     def hadamard_ratio(self, B):
-        """计算格的Hadamard比率（改进稳定性）"""
-        B_star = self.gram_schmidt(B.copy())
-        norms = [max(np.linalg.norm(v), 1e-10) for v in B_star]  # 防止零向量
-        det = np.prod(norms)
-        denominator = np.prod([max(np.linalg.norm(v), 1e-10) for v in B])
-        n = len(B)
-        return (abs(det) / denominator) ** (1 / n)
+        """计算格的Hadamard比率（基于QR的批量正交化）"""
+        return hadamard_ratio(B)
 
     def gram_schmidt(self, B):
-        """Gram-Schmidt正交化（带数值稳定性改进）"""
-        B = np.array(B, dtype=np.float64)  # 使用双精度浮点
-        n = len(B)
-        B_star = B.copy()
-
-        for i in range(1, n):
-            for j in range(i):
-                denominator = np.dot(B_star[j], B_star[j])
-                if abs(denominator) < 1e-12:  # 调整阈值
-                    print(f"跳过正交化: i={i}, j={j}, denominator={denominator}")
-                    continue
-                mu = np.dot(B[i], B_star[j]) / denominator
-                B_star[i] -= mu * B_star[j]
-        return B_star
-
-    def lll_reduction(self, B, delta=0.99):  # Lovász参数设置
-        """LLL算法实现（带稳定性改进和终止保护）"""
-        self.swap_count = 0  # 重置计数器
-        B = np.array(B, dtype=np.float64)
-        n = len(B)
-        B_star = self.gram_schmidt(B.copy())
-
-        k = 1
-        max_iter = 10 ** n  # 最大迭代次数
-        iter_count = 0
-
-        while k < n and iter_count < max_iter:
-            iter_count += 1
-
-            # 尺寸约减（带容错）
-            for j in range(k - 1, -1, -1):
-                denominator = np.dot(B_star[j], B_star[j])
-                if abs(denominator) < 1e-10:
-                    continue
-                mu = np.dot(B[k], B_star[j]) / denominator
-                if abs(mu) > 0.5 + 1e-6:  # 增加容错阈值
-                    B[k] -= np.round(mu) * B[j]
-                    B_star = self.gram_schmidt(B.copy())
-
-            # Lovász条件检查
-            denominator = np.dot(B_star[k - 1], B_star[k - 1])
-            if denominator < 1e-10:  # 处理零向量
-                k += 1
-                continue
-
-            mu = np.dot(B[k], B_star[k - 1]) / denominator
-            lhs = np.dot(B_star[k], B_star[k])
-            rhs = (delta - mu ** 2) * np.dot(B_star[k - 1], B_star[k - 1])
-
-            if lhs >= rhs - 1e-6:  # 增加容错
-                k += 1
-            else:
-                # 交换时增加计数
-                B[[k, k - 1]] = B[[k - 1, k]]
-                self.swap_count += 1  # 新增计数
-                B_star = self.gram_schmidt(B.copy())
-                k = max(k - 1, 1)
-
+        """Gram-Schmidt正交化（Householder QR，一次BLAS调用）"""
+        return gram_schmidt_qr(B)[0]
+
+    def lll_reduction(self, B, delta=0.99, mode="float", block_size=10, depth=None, workers=1,
+                      progress=None, cancel=None):  # Lovász参数设置
+        """LLL算法实现（mode: float增量浮点 / exact精确整数 / bkz块约简 / deep深插入 / segment分段并行）
+
+        progress(k, 交换次数, log D)定期回调；cancel被置位时尽快停止并返回部分约简的格基
+        """
+        self.status = None
+        self.stats = ReductionStats() if mode in ("float", "bkz", "deep") else None
+        if mode == "exact":
+            B, self.swap_count = lll_reduce_exact(B, delta, progress, cancel)
+        elif mode == "bkz":
+            B, self.status = bkz_reduce(B, block_size, delta, stats=self.stats, progress=progress, cancel=cancel)
+            self.swap_count = self.status.swaps
+        elif mode == "deep":
+            B, self.status = deep_lll_reduce(B, delta, depth, stats=self.stats, progress=progress, cancel=cancel)
+            self.swap_count = self.status.swaps + self.status.insertions
+        elif mode == "segment":
+            B, self.status = segment_lll_reduce(B, delta, workers, progress=progress, cancel=cancel)
+            self.swap_count = self.status.swaps
+        else:
+            B, self.status = lll_reduce(B, delta, stats=self.stats, progress=progress, cancel=cancel)
+            self.swap_count = self.status.swaps
         return B
 
     def is_lll_reduced(self, B, delta=0.75):
-        """后验验证函数（新增）"""
-        try:
-            B = np.array(B, dtype=np.float64)
-            B_star = self.gram_schmidt(B)
-
-            for k in range(1, len(B)):
-                # 检查尺寸约减
-                for j in range(k):
-                    denominator = np.dot(B_star[j], B_star[j])
-                    if denominator < 1e-10:
-                        continue
-                    mu = np.dot(B[k], B_star[j]) / denominator
-                    if abs(mu) > 0.5:
-                        return False
-
-                # 检查Lovász条件
-                denominator = np.dot(B_star[k - 1], B_star[k - 1])
-                if denominator < 1e-10:
-                    continue
-                mu = np.dot(B[k], B_star[k - 1]) / denominator
-                lhs = np.dot(B_star[k], B_star[k])
-                rhs = (delta - mu ** 2) * denominator
-                if lhs < rhs - 1e-6:
-                    return False
-            return True
-        except:
-            return False
+        """后验验证函数（向量化检查尺寸约减与Lovász条件）"""
+        return is_lll_reduced(B, delta)
 
     def generate_matrix(self):
         try:
@@ -179,8 +146,7 @@ class LLLGUI:
             row = []
             for entry in row_entries:
                 try:
-                    value = float(entry.get())
-                    row.append(value)
+                    row.append(parse_number(entry.get().strip()))  # 整数按原样保留，避免大整数丢失精度
                 except ValueError:
                     raise ValueError(f"非法元素: {entry.get()}")
             rows.append(row)
@@ -193,17 +159,79 @@ class LLLGUI:
         return np.array(rows)
 
     def start_calculation(self):
+        """解析输入后在后台线程中约简，主线程用after()轮询进度，窗口保持响应"""
+        if self.worker is not None and self.worker.is_alive():
+            return
         try:
             B = self.parse_matrix()
             orig_h = self.hadamard_ratio(B)
-
-            start_time = time.time()
-            reduced = self.lll_reduction(B)
-            calc_time = time.time() - start_time
-
-            # 后验验证
-            if not self.is_lll_reduced(reduced):
-                messagebox.showwarning("警告", "约减结果未完全满足LLL条件，可能存在数值误差")
+            mode = self.MODES[self.mode_var.get()]
+            block_size = int(self.block_entry.get())
+            depth = int(self.depth_entry.get()) if self.depth_entry.get().strip() else None
+            workers = int(self.workers_entry.get() or 1)
+        except Exception as e:
+            messagebox.showerror("错误", f"计算错误: {str(e)}")
+            return
+
+        self.cancel_event.clear()
+        self.progress_info = None
+        self.result = None
+        self.calc_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.progress_label.config(text="计算中...")
+        kwargs = dict(mode=mode, block_size=block_size, depth=depth, workers=workers,
+                      progress=self.report_progress, cancel=self.cancel_event)
+        self.worker = threading.Thread(target=self.run_reduction, args=(B, kwargs), daemon=True)
+        self.worker.start()
+        self.master.after(100, self.poll_worker, orig_h, mode)
+
+    def run_reduction(self, B, kwargs):
+        """后台线程：执行约简，结果或异常留给主线程显示（不在此线程访问Tk控件）"""
+        start_time = time.time()
+        try:
+            self.result = (self.lll_reduction(B, **kwargs), time.time() - start_time, None)
+        except Exception as e:
+            self.result = (None, time.time() - start_time, e)
+
+    def report_progress(self, k, swaps, log_potential):
+        """进度回调（在后台线程中调用），只记录最新进度"""
+        self.progress_info = (k, swaps, log_potential)
+
+    def poll_worker(self, orig_h, mode):
+        """主线程轮询后台约简：刷新进度，结束后显示结果"""
+        if self.worker.is_alive():
+            if self.progress_info is not None:
+                k, swaps, log_potential = self.progress_info
+                text = f"进度: k={k}, 交换 {swaps} 次"
+                if log_potential is not None:
+                    text += f", log D={log_potential:.2f}"
+                self.progress_label.config(text=text)
+            self.master.after(100, self.poll_worker, orig_h, mode)
+            return
+
+        self.calc_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.progress_label.config(text="已取消" if self.cancel_event.is_set() else "")
+        reduced, calc_time, error = self.result
+        if error is not None:
+            messagebox.showerror("错误", f"计算错误: {str(error)}")
+            return
+        self.show_result(reduced, orig_h, mode, calc_time)
+
+    def cancel_calculation(self):
+        """请求后台约简停止，停止后显示部分约简的格基"""
+        self.cancel_event.set()
+        self.progress_label.config(text="正在取消...")
+
+    def show_result(self, reduced, orig_h, mode, calc_time):
+        """在主线程中显示约简结果与各模式的统计"""
+        exact = mode == "exact" or reduced.dtype != np.float64  # 整数格基的结果按整数显示
+        try:
+            # 浮点模式由约简状态判断是否完成（精确模式无舍入误差）
+            if self.cancel_event.is_set():
+                messagebox.showwarning("警告", "计算已取消，显示的是部分约简的格基")
+            elif self.status is not None and not self.status.reduced:
+                messagebox.showwarning("警告", f"约减提前终止，结果未完全满足LLL条件：{self.status.reason}")
 
             reduced_h = self.hadamard_ratio(reduced)
 
@@ -211,8 +239,35 @@ class LLLGUI:
             self.result_text.delete(1.0, tk.END)
             self.result_text.insert(tk.END, "约简后的格基:\n")
             for row in reduced:
-                formatted_row = [f"{x:8.4f}" if abs(x) > 1e-4 else f"{0:8.4f}" for x in row]  # 过滤微小值
+                if exact:
+                    formatted_row = [f"{x:>8}" for x in row]
+                else:
+                    formatted_row = [f"{x:8.4f}" if abs(x) > 1e-4 else f"{0:8.4f}" for x in row]  # 过滤微小值
                 self.result_text.insert(tk.END, "[ " + "  ".join(formatted_row) + " ]\n")
+            if self.status is not None:
+                self.result_text.insert(tk.END, f"迭代次数: {self.status.iterations}, 势函数下降: "
+                                                f"{self.status.initial_log_potential - self.status.log_potential:.4f}\n")
+            if self.stats is not None:
+                self.result_text.insert(tk.END, f"耗时分布: 尺寸约减 {self.stats.size_reduction_time:.4f} 秒, "
+                                                f"Lovász检查 {self.stats.lovasz_time:.4f} 秒, "
+                                                f"交换 {self.stats.swap_time:.4f} 秒, "
+                                                f"正交化 {self.stats.gso_time:.4f} 秒 "
+                                                f"(重算 {self.stats.gso_recomputations} 次), "
+                                                f"最大|μ| {self.stats.max_mu:.4g}\n")
+            quality = basis_quality(reduced)
+            self.result_text.insert(tk.END, f"Hermite因子: {quality['hermite_factor']:.6f}\n")
+            if mode == "deep":
+                self.result_text.insert(tk.END, f"深插入次数: {self.status.insertions}\n")
+            if mode == "bkz":
+                for tour in self.status.tours:
+                    self.result_text.insert(tk.END, f"第{tour['tour']}轮: 插入 {tour['insertions']} 次, "
+                                                    f"交换 {tour['swaps']} 次, 枚举节点 {tour['nodes']}, "
+                                                    f"‖b1‖={tour['b1_norm']:.4f}, 耗时 {tour['time']:.4f} 秒\n")
+            if mode == "segment":
+                for round_stats in self.status.rounds:
+                    self.result_text.insert(tk.END, f"第{round_stats['round']}轮: {round_stats['blocks']} 个块, "
+                                                    f"块内交换 {round_stats['swaps']} 次, "
+                                                    f"耗时 {round_stats['time']:.4f} 秒\n")
 
             # 更新显示
             self.orig_h_label.config(text=f"原始Hadamard比率: {orig_h:.6f}")
@@ -237,6 +292,7 @@ class LLLGUI:
         self.reduced_h_label.config(text="约减后Hadamard比率: ")
         self.time_label.config(text="计算时间：")
         self.swap_label.config(text="交换次数: 0")  # 新增清空
+        self.progress_label.config(text="")
 
 
 if __name__ == "__main__":
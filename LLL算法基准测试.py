@@ -0,0 +1,333 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from 格基约简 import (basis_quality, bkz_reduce, deep_lll_reduce, lll_reduce, lll_reduce_exact,
+                  segment_lll_reduce)
+from 背包格攻击 import EMBEDDINGS, construct_lattice, solve_subset_sum, solve_subset_sum_batch
+
+
+def knapsack_instance(n, bits, seed=0):
+    """生成带已知解的随机子集和实例，格基由背包问题的construct_lattice构造"""
+    rng = random.Random(seed)
+    weights = [rng.getrandbits(bits) | 1 for _ in range(n)]
+    x = [rng.randint(0, 1) for _ in range(n)]
+    target = sum(w for w, xi in zip(weights, x) if xi)
+    return construct_lattice(weights, target), weights, target
+
+
+def has_solution(reduced, weights, target):
+    """用精确整数检查约简结果中是否存在真正的0/1解（不依赖浮点容差）"""
+    n = len(weights)
+    for row in reduced:
+        try:
+            x = [int(round(float(v))) for v in row[:n]]
+        except OverflowError:
+            continue
+        if any(v not in (0, 1) for v in x) or not any(x):
+            continue
+        if sum(w * v for w, v in zip(weights, x)) == target:
+            return True
+    return False
+
+
+def benchmark_exact_vs_float(dims=(10, 20), bit_sizes=(26, 64, 200, 500), seed=0):
+    """对比浮点LLL与精确整数LLL的耗时和求解正确性"""
+    print(f"{'n':>4} {'bits':>5} {'float(s)':>10} {'float解':>8} {'exact(s)':>10} {'exact解':>8} {'倍数':>8}")
+    for n in dims:
+        for bits in bit_sizes:
+            B, weights, target = knapsack_instance(n, bits, seed)
+
+            start = time.perf_counter()
+            try:
+                reduced, _ = lll_reduce(B)
+                float_ok = has_solution(reduced, weights, target)
+            except (OverflowError, FloatingPointError, ValueError):
+                float_ok = False
+            float_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            reduced, _ = lll_reduce_exact(B)
+            exact_ok = has_solution(reduced, weights, target)
+            exact_time = time.perf_counter() - start
+
+            print(f"{n:>4} {bits:>5} {float_time:>10.4f} {str(float_ok):>8} "
+                  f"{exact_time:>10.4f} {str(exact_ok):>8} {exact_time / float_time:>8.1f}")
+
+
+def qary_basis(n, q=1031, seed=0):
+    """n维q元格 [[qI, 0], [A, I]]（A为随机 n/2 阶方阵），LLL远达不到最短向量，适合比较约简质量"""
+    rng = random.Random(seed)
+    m = n // 2
+    B = [[0] * n for _ in range(n)]
+    for i in range(m):
+        B[i][i] = q
+    for i in range(m, n):
+        for j in range(m):
+            B[i][j] = rng.randrange(q)
+        B[i][i] = 1
+    return B
+
+
+def uniform_basis(n, bits, seed=0):
+    """元素在 [-2^(bits-1), 2^(bits-1)) 上均匀分布的随机满秩方阵"""
+    rng = random.Random(seed)
+    while True:
+        B = [[rng.randrange(-(1 << (bits - 1)), 1 << (bits - 1)) for _ in range(n)] for _ in range(n)]
+        if abs(np.linalg.slogdet(np.array(B, dtype=np.float64))[1]) > 0 or n == 0:
+            return B
+
+
+def ntru_basis(n, bits, seed=0):
+    """NTRU型格 [[I, H], [0, qI]]：H为随机h的循环矩阵，q = 2^bits，维数2·(n//2)"""
+    rng = random.Random(seed)
+    m = n // 2
+    q = 1 << bits
+    h = [rng.randrange(q) for _ in range(m)]
+    B = [[0] * (2 * m) for _ in range(2 * m)]
+    for i in range(m):
+        B[i][i] = 1
+        for j in range(m):
+            B[i][m + j] = h[(j - i) % m]
+        B[m + i][m + i] = q
+    return B
+
+
+GENERATORS = {
+    "uniform": uniform_basis,
+    "knapsack": lambda n, bits, seed=0: knapsack_instance(n - 1, bits, seed)[0].tolist(),
+    "ntru": ntru_basis,
+    "qary": lambda n, bits, seed=0: qary_basis(n, (1 << bits) - 1, seed),
+}
+
+REDUCERS = {
+    "lll": lll_reduce,
+    "exact": lll_reduce_exact,
+    "deep": deep_lll_reduce,
+    "bkz10": lambda B: bkz_reduce(B, 10),
+    "segment": segment_lll_reduce,
+}
+
+
+def _run_reducer(name, B):
+    """统一各约简器的返回值：(约简结果, 交换次数, 迭代次数或None, 是否约简完成)"""
+    result = REDUCERS[name](B)
+    if name == "exact":
+        return result[0], result[1], None, True
+    reduced, status = result
+    return reduced, status.swaps, status.iterations, status.reduced
+
+
+def run_suite(families=tuple(GENERATORS), dims=(10, 20, 30), bit_sizes=(10, 30), reducers=tuple(REDUCERS),
+              seed=0, measure_memory=True, repeats=5):
+    """在 (格类型, 维数, 位数, 约简器) 网格上计时，返回结果记录列表
+
+    每格重复repeats次取最短耗时（调度、缓存等噪声只会让耗时变长）；
+    峰值内存由tracemalloc单独再跑一次测得，不影响计时
+    """
+    results = []
+    for family in families:
+        for n in dims:
+            for bits in bit_sizes:
+                B = GENERATORS[family](n, bits, seed)
+                for name in reducers:
+                    elapsed = float("inf")
+                    for _ in range(max(1, repeats)):
+                        start = time.perf_counter()
+                        reduced, swaps, iterations, reduced_ok = _run_reducer(name, B)
+                        elapsed = min(elapsed, time.perf_counter() - start)
+
+                    peak = None
+                    if measure_memory:
+                        tracemalloc.start()
+                        _run_reducer(name, B)
+                        peak = tracemalloc.get_traced_memory()[1] / 1024
+                        tracemalloc.stop()
+
+                    results.append({
+                        "family": family,
+                        "n": len(B),
+                        "bits": bits,
+                        "seed": seed,
+                        "reducer": name,
+                        "time": elapsed,
+                        "swaps": swaps,
+                        "iterations": iterations,
+                        "reduced": reduced_ok,
+                        "hermite_factor": basis_quality(reduced)["hermite_factor"],
+                        "peak_memory_kb": peak,
+                    })
+                    print(f"{family:>9} {len(B):>4} {bits:>5} {name:>6} {elapsed:>10.4f} {swaps:>8} "
+                          f"{results[-1]['hermite_factor']:>12.6f} {'' if reduced_ok else '未完成'}")
+    return results
+
+
+def compare_baseline(results, baseline, time_tolerance=2.0, min_time=0.1, total_tolerance=1.3):
+    """与基线结果比较，返回回归描述列表
+
+    单格耗时超过基线time_tolerance倍（基线耗时不足min_time秒的不计，避免噪声）、
+    某个约简器在共同格上的总耗时超过基线total_tolerance倍（单格多在0.1秒以下，总和噪声小得多，
+    实测相同代码多次运行的总耗时相差不到1.2倍）、Hermite因子变差或原本完成的约简未完成都视为回归
+    """
+    key = lambda r: (r["family"], r["n"], r["bits"], r["seed"], r["reducer"])
+    base = {key(r): r for r in baseline}
+    regressions = []
+    totals = {}  # 约简器 -> [基线总耗时, 本次总耗时]
+    for r in results:
+        old = base.get(key(r))
+        if old is None:
+            continue
+        total = totals.setdefault(r["reducer"], [0.0, 0.0])
+        total[0] += old["time"]
+        total[1] += r["time"]
+        name = "/".join(str(x) for x in key(r))
+        if old["time"] >= min_time and r["time"] > old["time"] * time_tolerance:
+            regressions.append(f"{name}: 耗时 {old['time']:.4f}s -> {r['time']:.4f}s")
+        if r["hermite_factor"] > old["hermite_factor"] * (1 + 1e-6):
+            regressions.append(f"{name}: Hermite因子 {old['hermite_factor']:.6f} -> {r['hermite_factor']:.6f}")
+        if old["reduced"] and not r["reduced"]:
+            regressions.append(f"{name}: 约简未完成")
+    for reducer, (old_total, new_total) in totals.items():
+        if old_total >= min_time and new_total > old_total * total_tolerance:
+            regressions.append(f"{reducer}: 总耗时 {old_total:.4f}s -> {new_total:.4f}s")
+    return regressions
+
+
+def benchmark_embeddings(dims=(20, 30), densities=(0.6, 0.8, 0.94), trials=20, seed=0):
+    """对比Lagarias–Odlyzko与CJLOSS嵌入在不同密度 n/log2(max w) 下的求解成功率与平均耗时"""
+    print(f"{'n':>4} {'密度':>6} {'bits':>5} " + " ".join(f"{e + '成功率':>12} {e + '(s)':>10}" for e in EMBEDDINGS))
+    for n in dims:
+        for density in densities:
+            bits = max(2, round(n / density))
+            line = f"{n:>4} {density:>6.2f} {bits:>5} "
+            for embedding in EMBEDDINGS:
+                solved = 0
+                start = time.perf_counter()
+                for trial in range(trials):
+                    _, weights, target = knapsack_instance(n, bits, seed + trial)
+                    solution, _, _ = solve_subset_sum(weights, target, exact=bits > 26, embedding=embedding)
+                    solved += solution is not None
+                elapsed = (time.perf_counter() - start) / trials
+                line += f"{solved / trials:>12.0%} {elapsed:>10.4f} "
+            print(line)
+
+
+def benchmark_batch_knapsack(dims=(20, 30), bits=40, count=20, embedding="lo", max_workers=None, seed=0):
+    """同一组重量下多个目标的吞吐量（目标数/秒）：逐个完整约简 vs 共享权重子格的批量求解"""
+    max_workers = max_workers or os.cpu_count() or 1
+    print(f"{'n':>4} {'方式':<10} {'成功':>6} {'时间(s)':>10} {'目标/秒':>10}")
+    for n in dims:
+        rng = random.Random(seed)
+        weights = [rng.getrandbits(bits) | 1 for _ in range(n)]
+        targets = [sum(w for w in weights if rng.randint(0, 1)) for _ in range(count)]
+        exact = bits > 26
+
+        start = time.perf_counter()
+        solved = sum(solve_subset_sum(weights, t, exact=exact, embedding=embedding)[0] is not None for t in targets)
+        elapsed = time.perf_counter() - start
+        print(f"{n:>4} {'逐个':<10} {solved:>6} {elapsed:>10.4f} {count / elapsed:>10.1f}")
+        for workers in sorted({1, max_workers}):
+            _, status = solve_subset_sum_batch(weights, targets, exact=exact, embedding=embedding, workers=workers)
+            print(f"{n:>4} {f'批量×{workers}':<10} {status.solved:>6} "
+                  f"{status.sublattice_time + status.solve_time:>10.4f} {status.throughput:>10.1f}")
+
+
+def benchmark_deep_insertion(dims=(30, 40), depths=(2, 5, 10, None), seed=0):
+    """对比LLL、不同深度的深插入LLL与BKZ-10：耗时、Hermite因子、Hadamard比率"""
+    print(f"{'n':>4} {'算法':<12} {'时间(s)':>10} {'Hermite因子':>12} {'Hadamard比率':>12}")
+    for n in dims:
+        B = qary_basis(n, seed=seed)
+        reducers = [("LLL", lambda: lll_reduce(B))]
+        reducers += [(f"Deep-{depth or '∞'}", lambda depth=depth: deep_lll_reduce(B, depth=depth)) for depth in depths]
+        reducers.append(("BKZ-10", lambda: bkz_reduce(B, 10)))
+        for name, reduce in reducers:
+            start = time.perf_counter()
+            reduced, _ = reduce()
+            elapsed = time.perf_counter() - start
+            quality = basis_quality(reduced)
+            print(f"{n:>4} {name:<12} {elapsed:>10.4f} {quality['hermite_factor']:>12.6f} "
+                  f"{quality['hadamard_ratio']:>12.6f}")
+
+
+def benchmark_segment_scaling(dims=(200,), max_workers=None, seed=0):
+    """分段并行LLL的扩展性：进程数从1倍增到max_workers（默认CPU核数），与顺序LLL比较墙钟时间"""
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+
+    print(f"{'n':>4} {'进程数':>6} {'时间(s)':>10} {'加速比':>8} {'交换次数':>10} {'Hermite因子':>12}")
+    for n in dims:
+        B = qary_basis(n, seed=seed)
+        start = time.perf_counter()
+        reduced, status = lll_reduce(B)
+        base_time = time.perf_counter() - start
+        print(f"{n:>4} {'顺序':>6} {base_time:>10.4f} {1.0:>8.2f} {status.swaps:>10} "
+              f"{basis_quality(reduced)['hermite_factor']:>12.6f}")
+        for workers in counts:
+            start = time.perf_counter()
+            reduced, status = segment_lll_reduce(B, workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f"{n:>4} {workers:>6} {elapsed:>10.4f} {base_time / elapsed:>8.2f} {status.swaps:>10} "
+                  f"{basis_quality(reduced)['hermite_factor']:>12.6f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="格基约简基准测试：固定种子的随机格基网格，结果输出为JSON并可与基线比较")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="结果文件（默认benchmark.json）")
+    parser.add_argument("--baseline", help="基线结果文件，出现回归时返回非零退出码")
+    parser.add_argument("--families", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--reducers", nargs="+", choices=list(REDUCERS), default=list(REDUCERS))
+    parser.add_argument("--dims", nargs="+", type=int, default=[10, 20, 30])
+    parser.add_argument("--bits", nargs="+", type=int, default=[10, 30])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=5, help="每格重复次数，计时取最短（默认5）")
+    parser.add_argument("--time-tolerance", type=float, default=2.0, help="单格耗时回归阈值（相对基线的倍数，默认2.0）")
+    parser.add_argument("--min-time", type=float, default=0.1, help="基线耗时低于此秒数的格不比较耗时（默认0.1）")
+    parser.add_argument("--total-tolerance", type=float, default=1.3,
+                        help="各约简器总耗时的回归阈值（相对基线的倍数，默认1.3）")
+    parser.add_argument("--no-memory", action="store_true", help="不测峰值内存（省去第二次运行）")
+    parser.add_argument("--tables", action="store_true", help="只打印原有的对比表（精确/浮点、背包嵌入与批量求解、深插入、分段并行）")
+    args = parser.parse_args(argv)
+
+    if args.tables:
+        benchmark_exact_vs_float()
+        benchmark_embeddings()
+        benchmark_batch_knapsack()
+        benchmark_deep_insertion()
+        benchmark_segment_scaling()
+        return 0
+
+    print(f"{'格类型':>9} {'n':>4} {'bits':>5} {'算法':>6} {'时间(s)':>10} {'交换':>8} {'Hermite因子':>12}")
+    results = run_suite(args.families, args.dims, args.bits, args.reducers, args.seed, not args.no_memory,
+                        args.repeats)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "results": results,
+        }, f, ensure_ascii=False, indent=1)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_baseline(results, json.load(f)["results"], args.time_tolerance, args.min_time,
+                                           args.total_tolerance)
+        for line in regressions:
+            print("回归:", line)
+        print(f"与基线比较: {len(regressions)} 项回归")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
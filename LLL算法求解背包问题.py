@@ -1,15 +1,27 @@
-import numpy as np
+import os
+
 import tkinter as tk
 from tkinter import messagebox, scrolledtext
+import threading
 import time
+from 格基约简 import bkz_reduce, gram_schmidt_qr, hadamard_ratio, is_lll_reduced, parse_number
+from 背包格攻击 import (construct_lattice, find_solution, solve_subset_sum, solve_subset_sum_batch,
+                   solve_subset_sum_restarts)
 
 
 class KnapsackLLLGUI:
+    EMBEDDINGS = {"Lagarias–Odlyzko": "lo", "CJLOSS(±1/2)": "cjloss"}
+    RESTART_BUDGET = 30.0  # 随机重启的总时限（秒）
+
     def __init__(self, master):
         self.master = master
         master.title("LLL算法求解背包问题")
         master.geometry("1000x700")
         self.swap_count = 0  # 新增交换次数计数器
+        self.status = None  # 浮点模式的约简状态（LLLStatus）
+        self.worker = None  # 后台随机重启线程
+        self.cancel_event = threading.Event()
+        self.restart_result = None
         self.create_widgets()
 
     def create_widgets(self):
@@ -23,7 +35,7 @@ class KnapsackLLLGUI:
         self.weights_entry.pack(side=tk.LEFT, padx=5)
 
         # 目标重量输入
-        tk.Label(input_frame, text="目标重量:").pack(side=tk.LEFT, padx=5)
+        tk.Label(input_frame, text="目标重量（多个用空格分隔）:").pack(side=tk.LEFT, padx=5)
         self.target_entry = tk.Entry(input_frame, width=10)
         self.target_entry.pack(side=tk.LEFT, padx=5)
 
@@ -34,6 +46,18 @@ class KnapsackLLLGUI:
         self.calc_btn.pack(side=tk.LEFT, padx=5)
         self.clear_btn = tk.Button(button_frame, text="清空输入", command=self.clear_input)
         self.clear_btn.pack(side=tk.LEFT, padx=5)
+        self.cancel_btn = tk.Button(button_frame, text="取消重启", command=self.cancel_restart, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
+        self.exact_var = tk.BooleanVar(value=False)  # 大重量（N·w超过2^26）时使用精确整数模式
+        tk.Checkbutton(button_frame, text="精确整数模式", variable=self.exact_var).pack(side=tk.LEFT, padx=5)
+        self.embedding_var = tk.StringVar(value="Lagarias–Odlyzko")  # CJLOSS的解向量更短，密度较高时成功率更高
+        tk.OptionMenu(button_frame, self.embedding_var, *self.EMBEDDINGS).pack(side=tk.LEFT, padx=5)
+        self.restart_var = tk.BooleanVar(value=False)  # 未找到解时并行随机重启，限时RESTART_BUDGET秒
+        tk.Checkbutton(button_frame, text="失败时随机重启", variable=self.restart_var).pack(side=tk.LEFT, padx=5)
+        tk.Label(button_frame, text="BKZ块大小(0=仅LLL):").pack(side=tk.LEFT, padx=5)
+        self.block_entry = tk.Entry(button_frame, width=5)
+        self.block_entry.insert(0, "0")
+        self.block_entry.pack(side=tk.LEFT, padx=5)
 
         # 输出区域
         output_frame = tk.LabelFrame(self.master, text="计算结果")
@@ -55,114 +79,46 @@ class KnapsackLLLGUI:
         self.result_text.pack(padx=5, pady=5, fill=tk.BOTH, expand=True)
 
     def hadamard_ratio(self, B):
-        """计算格的Hadamard比率（改进稳定性）"""
-        B_star = self.gram_schmidt(B.copy())
-        norms = [max(np.linalg.norm(v), 1e-10) for v in B_star]  # 防止零向量
-        det = np.prod(norms)
-        denominator = np.prod([max(np.linalg.norm(v), 1e-10) for v in B])
-        n = len(B)
-        return (abs(det) / denominator) ** (1 / n)
+        """计算格的Hadamard比率（基于QR的批量正交化）"""
+        return hadamard_ratio(B)
 
     def gram_schmidt(self, B):
-        """Gram-Schmidt正交化（带数值稳定性改进）"""
-        B = np.array(B, dtype=np.float64)  # 使用双精度浮点
-        n = len(B)
-        B_star = B.copy()
-
-        for i in range(1, n):
-            for j in range(i):
-                denominator = np.dot(B_star[j], B_star[j])
-                if abs(denominator) < 1e-12:  # 调整阈值
-                    print(f"跳过正交化: i={i}, j={j}, denominator={denominator}")
-                    continue
-                mu = np.dot(B[i], B_star[j]) / denominator
-                B_star[i] -= mu * B_star[j]
-        return B_star
-
-    def lll_reduction(self, B, delta=0.99):
-        """LLL算法实现（带稳定性改进和终止保护）"""
-        self.swap_count = 0  # 重置计数器
-        B = np.array(B, dtype=np.float64)
-        n = len(B)
-        B_star = self.gram_schmidt(B.copy())
-
-        k = 1
-        max_iter = 10 ** n  # 最大迭代次数
-        iter_count = 0
-
-        while k < n and iter_count < max_iter:
-            iter_count += 1
-            self.result_text.insert(tk.END, f"迭代次数: {iter_count}, 当前 k: {k}\n")
-
-            # 尺寸约减（带容错）
-            for j in range(k - 1, -1, -1):
-                denominator = np.dot(B_star[j], B_star[j])
-                if abs(denominator) < 1e-10:
-                    continue
-                mu = np.dot(B[k], B_star[j]) / denominator
-                if abs(mu) > 0.5 + 1e-6:  # 增加容错阈值
-                    B[k] -= np.round(mu) * B[j]
-                    B_star = self.gram_schmidt(B.copy())
-                    self.result_text.insert(tk.END, f"尺寸约减: k={k}, j={j}, mu={mu:.6f}\n")
-
-            # Lovász条件检查
-            denominator = np.dot(B_star[k - 1], B_star[k - 1])
-            if denominator < 1e-10:  # 处理零向量
-                k += 1
-                continue
-
-            mu = np.dot(B[k], B_star[k - 1]) / denominator
-            lhs = np.dot(B_star[k], B_star[k])
-            rhs = (delta - mu ** 2) * np.dot(B_star[k - 1], B_star[k - 1])
-
-            if lhs >= rhs - 1e-6:  # 增加容错
-                k += 1
-                self.result_text.insert(tk.END, f"Lovász条件满足: k={k}, mu={mu:.6f}, lhs={lhs:.6f}, rhs={rhs:.6f}\n")
-            else:
-                # 交换时增加计数
-                B[[k, k - 1]] = B[[k - 1, k]]
-                self.swap_count += 1  # 新增计数
-                B_star = self.gram_schmidt(B.copy())
-                k = max(k - 1, 1)
-                self.result_text.insert(tk.END, f"交换操作: k={k}, mu={mu:.6f}, lhs={lhs:.6f}, rhs={rhs:.6f}\n")
-
-            # 更新界面
-            self.result_text.see(tk.END)
-            self.master.update_idletasks()
-
+        """Gram-Schmidt正交化（Householder QR，一次BLAS调用）"""
+        return gram_schmidt_qr(B)[0]
+
+    def report_status(self, status, retry=False):
+        """显示一次浮点约简的状态（各阶段势函数下降、迭代与交换次数、提前结束原因），retry表示按原始行序重新约简"""
+        self.status = status
+        if retry:
+            self.result_text.insert(tk.END, "按原始行序重新约简\n")  # 目标行在前时浮点精度更容易不足
+        for i, decrease in enumerate(status.phase_decrease):
+            self.result_text.insert(tk.END, f"阶段 {i + 1}: 势函数下降 {decrease:.4f}\n")
+        self.result_text.insert(tk.END, f"迭代次数: {status.iterations}, 交换次数: {status.swaps}\n")
+        if status.stopped_at is not None:
+            self.result_text.insert(tk.END, f"第{status.stopped_at + 1}行已是解向量，提前结束约简\n")
+        elif not status.reduced:
+            self.result_text.insert(tk.END, f"约减提前终止: {status.reason}\n")
+        self.result_text.see(tk.END)
+
+    def bkz_reduction(self, B, block_size, delta=0.99):
+        """在LLL结果上继续做BKZ块约简，高密度实例更容易暴露短向量"""
+        B, status = bkz_reduce(B, block_size, delta)
+        self.swap_count += status.swaps
+        for tour in status.tours:
+            self.result_text.insert(tk.END, f"BKZ第{tour['tour']}轮: 插入 {tour['insertions']} 次, "
+                                            f"交换 {tour['swaps']} 次, 枚举节点 {tour['nodes']}, "
+                                            f"‖b1‖={tour['b1_norm']:.4f}\n")
+        if not status.reduced:
+            self.result_text.insert(tk.END, f"BKZ提前终止: {status.reason}\n")
+        self.result_text.see(tk.END)
         return B
 
     def is_lll_reduced(self, B, delta=0.75):
-        """后验验证函数（新增）"""
-        try:
-            B = np.array(B, dtype=np.float64)
-            B_star = self.gram_schmidt(B)
-
-            for k in range(1, len(B)):
-                # 检查尺寸约减
-                for j in range(k):
-                    denominator = np.dot(B_star[j], B_star[j])
-                    if denominator < 1e-10:
-                        continue
-                    mu = np.dot(B[k], B_star[j]) / denominator
-                    if abs(mu) > 0.5:
-                        return False
-
-                # 检查Lovász条件
-                denominator = np.dot(B_star[k - 1], B_star[k - 1])
-                if denominator < 1e-10:
-                    continue
-                mu = np.dot(B[k], B_star[k - 1]) / denominator
-                lhs = np.dot(B_star[k], B_star[k])
-                rhs = (delta - mu ** 2) * denominator
-                if lhs < rhs - 1e-6:
-                    return False
-            return True
-        except:
-            return False
+        """后验验证函数（向量化检查尺寸约减与Lovász条件）"""
+        return is_lll_reduced(B, delta)
 
     def parse_input(self):
-        """解析输入的物品重量列表和目标重量"""
+        """解析输入的物品重量列表和目标重量（多个目标时返回目标列表）"""
         weights_str = self.weights_entry.get().strip()
         target_str = self.target_entry.get().strip()
 
@@ -170,85 +126,157 @@ class KnapsackLLLGUI:
             raise ValueError("物品重量列表和目标重量不能为空")
 
         try:
-            weights = [float(w) for w in weights_str.split()]
-            target = float(target_str)
+            weights = [parse_number(w) for w in weights_str.split()]
+            targets = [parse_number(t) for t in target_str.split()]
         except ValueError:
             raise ValueError("输入的物品重量或目标重量必须为数字")
 
-        return weights, target
+        return weights, targets[0] if len(targets) == 1 else targets
 
-    def construct_lattice(self, weights, target):
+    def construct_lattice(self, weights, target, embedding="lo"):
         """构造用于求解子集和问题的格基矩阵"""
-        n = len(weights)
-        N = 2 * max(max(weights), target)  # 选择合适的N值
-        B = np.zeros((n + 1, n + 1))
-        for i in range(n):
-            B[i, i] = 1
-            B[i, -1] = N * weights[i]
-        B[-1, :-1] = 0
-        B[-1, -1] = -N * target
-        return B
-
-    def find_solution(self, reduced, weights):
-        """从约减后的格基矩阵中寻找子集和问题的解"""
-        n = len(weights)
-        eps = 1e-6
-        for row in reduced:
-            solution = []
-            valid = True
-            for i in range(n):
-                if abs(row[i]) < eps:
-                    solution.append(0)
-                elif abs(row[i] - 1) < eps:
-                    solution.append(1)
-                else:
-                    valid = False
-                    break
-            if valid and abs(row[-1]) < eps:
-                return solution
-        return None
+        return construct_lattice(weights, target, embedding)
+
+    def find_solution(self, reduced, weights, target=None):
+        """从约减后的格基矩阵中寻找子集和问题的解（给出target时识别±1解向量与补集解）"""
+        return find_solution(reduced, weights, target)
+
+    def solve_batch(self, weights, targets):
+        """同一组重量下批量求解多个目标：共享约简好的权重子格，各目标在进程池中并行"""
+        embedding = self.EMBEDDINGS[self.embedding_var.get()]
+        solutions, status = solve_subset_sum_batch(weights, targets, exact=self.exact_var.get(),
+                                                   embedding=embedding, workers=os.cpu_count() or 1)
+        for target, solution in zip(targets, solutions):
+            if solution is not None:
+                selected_weights = [w for w, s in zip(weights, solution) if s]
+                self.result_text.insert(tk.END, f"目标 {target}: 选择的物品重量为 {selected_weights}\n")
+            else:
+                self.result_text.insert(tk.END, f"目标 {target}: 未找到解\n")
+        self.result_text.insert(tk.END, f"\n批量求解完成: {status.solved}/{status.targets} 个目标有解，"
+                                        f"子格约简 {status.sublattice_time:.4f} 秒，"
+                                        f"吞吐量 {status.throughput:.1f} 个/秒（{status.workers} 进程）\n")
+        self.result_text.see(tk.END)
+        self.swap_count = status.swaps
+        self.time_label.config(text=f"计算时间：{status.sublattice_time + status.solve_time:.4f} 秒")
+        self.swap_label.config(text=f"交换次数: {self.swap_count}")
+
+    def restart(self, weights, target, finish):
+        """首次约简未找到解时，在后台线程中用多个随机种子随机化格基、在进程池中并行重新约简
+
+        主线程用after()轮询，窗口保持响应，可随时取消；结束后在主线程中调用finish(解或None, 重启耗时)
+        """
+        workers = os.cpu_count() or 1
+        kwargs = dict(exact=self.exact_var.get(), embedding=self.EMBEDDINGS[self.embedding_var.get()],
+                      seeds=max(8, 2 * workers), workers=workers, time_budget=self.RESTART_BUDGET, initial=False,
+                      cancel=self.cancel_event)
+        self.cancel_event.clear()
+        self.restart_result = None
+        self.calc_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.result_text.insert(tk.END, f"首次约简未找到解，随机重启中（最多 {self.RESTART_BUDGET:g} 秒）...\n")
+        self.result_text.see(tk.END)
+        self.worker = threading.Thread(target=self.run_restart, args=(weights, target, kwargs), daemon=True)
+        self.worker.start()
+        self.master.after(100, self.poll_restart, finish)
+
+    def run_restart(self, weights, target, kwargs):
+        """后台线程：执行随机重启，结果或异常留给主线程显示（不在此线程访问Tk控件）"""
+        try:
+            self.restart_result = (*solve_subset_sum_restarts(weights, target, **kwargs), None)
+        except Exception as e:
+            self.restart_result = (None, None, e)
+
+    def poll_restart(self, finish):
+        """主线程轮询后台重启，结束后显示结果"""
+        if self.worker.is_alive():
+            self.master.after(100, self.poll_restart, finish)
+            return
+
+        self.calc_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        solution, status, error = self.restart_result
+        if error is not None:
+            messagebox.showerror("错误", f"随机重启错误: {str(error)}")
+        elif solution is not None:
+            self.result_text.insert(tk.END, f"随机重启：种子 {status.seed} 找到解（{status.attempts} 次尝试，"
+                                            f"{status.elapsed:.4f} 秒）\n")
+        elif status.cancelled:
+            self.result_text.insert(tk.END, f"随机重启：已取消（{status.attempts} 次尝试）\n")
+        elif status.timed_out:
+            self.result_text.insert(tk.END, f"随机重启：{self.RESTART_BUDGET:g} 秒内未找到解\n")
+        else:
+            self.result_text.insert(tk.END, f"随机重启：{status.attempts} 次尝试均未找到解\n")
+        finish(solution, status.elapsed if status is not None else 0.0)
+
+    def cancel_restart(self):
+        """请求后台随机重启停止"""
+        self.cancel_event.set()
 
     def start_calculation(self):
+        if self.worker is not None and self.worker.is_alive():
+            return
         try:
             # 解析输入
             weights, target = self.parse_input()
+            if isinstance(target, list):
+                self.solve_batch(weights, target)
+                return
 
             # 构造格基矩阵
-            B = self.construct_lattice(weights, target)
-            orig_h = self.hadamard_ratio(B)
+            embedding = self.EMBEDDINGS[self.embedding_var.get()]
+            orig_h = self.hadamard_ratio(self.construct_lattice(weights, target, embedding))
 
+            exact = self.exact_var.get()
+            block_size = int(self.block_entry.get() or 0)
             start_time = time.time()
-            # 进行LLL约化
-            reduced = self.lll_reduction(B)
+            # 进行LLL约化（目标行在前、出现解向量即停止、精度不足时按原始行序重试，见solve_subset_sum）
+            self.status = None
+            solution, reduced, self.swap_count = solve_subset_sum(weights, target, exact=exact, embedding=embedding,
+                                                                  report=self.report_status)
+            if exact:
+                self.result_text.insert(tk.END, f"精确整数LLL完成: 交换次数={self.swap_count}\n")
+            solved = solution is not None
+            if block_size and not solved:
+                reduced = self.bkz_reduction(reduced, block_size)
             calc_time = time.time() - start_time
 
-            # 后验验证
-            if not self.is_lll_reduced(reduced):
-                messagebox.showwarning("警告", "约减结果未完全满足LLL条件，可能存在数值误差")
+            # 浮点模式由约简状态判断是否完成（精确模式无舍入误差）
+            if self.status is not None and not self.status.reduced and not solved:
+                messagebox.showwarning("警告", f"约减提前终止，结果未完全满足LLL条件：{self.status.reason}")
 
             reduced_h = self.hadamard_ratio(reduced)
 
             # 寻找解
-            solution = self.find_solution(reduced, weights)
+            solution = self.find_solution(reduced, weights, target)
 
-            # 显示结果
-            self.result_text.insert(tk.END, f"\nLLL约化完成\n")
-            if solution is not None:
-                selected_weights = [w for w, s in zip(weights, solution) if s]
-                total_weight = sum(selected_weights)
-                self.result_text.insert(tk.END, f"找到解：选择的物品重量为 {selected_weights}，总重量为 {total_weight}\n")
-            else:
-                self.result_text.insert(tk.END, "未找到满足条件的解。\n")
+            def finish(solution, restart_time=0.0):
+                self.show_result(weights, solution, orig_h, reduced_h, calc_time + restart_time)
 
-            # 更新显示
-            self.orig_h_label.config(text=f"原始Hadamard比率: {orig_h:.6f}")
-            self.reduced_h_label.config(text=f"约减后Hadamard比率: {reduced_h:.6f}")
-            self.time_label.config(text=f"计算时间：{calc_time:.4f} 秒")
-            self.swap_label.config(text=f"交换次数: {self.swap_count}")
+            if solution is None and self.restart_var.get():
+                self.restart(weights, target, finish)  # 后台线程中进行，结束后调用finish
+            else:
+                finish(solution)
 
         except Exception as e:
             messagebox.showerror("错误", f"计算错误: {str(e)}")
 
+    def show_result(self, weights, solution, orig_h, reduced_h, calc_time):
+        """显示求解结果与Hadamard比率、计算时间、交换次数"""
+        self.result_text.insert(tk.END, f"\nLLL约化完成\n")
+        if solution is not None:
+            selected_weights = [w for w, s in zip(weights, solution) if s]
+            total_weight = sum(selected_weights)
+            self.result_text.insert(tk.END, f"找到解：选择的物品重量为 {selected_weights}，总重量为 {total_weight}\n")
+        else:
+            self.result_text.insert(tk.END, "未找到满足条件的解。\n")
+        self.result_text.see(tk.END)
+
+        # 更新显示
+        self.orig_h_label.config(text=f"原始Hadamard比率: {orig_h:.6f}")
+        self.reduced_h_label.config(text=f"约减后Hadamard比率: {reduced_h:.6f}")
+        self.time_label.config(text=f"计算时间：{calc_time:.4f} 秒")
+        self.swap_label.config(text=f"交换次数: {self.swap_count}")
+
     def clear_input(self):
         """清空所有输入输出"""
         self.weights_entry.delete(0, tk.END)
@@ -0,0 +1,279 @@
+"""最近向量问题（CVP）求解核心：Babai最近平面解码、取整解码、Schnorr–Euchner枚举求精确解、
+Kannan嵌入（把CVP化为SVP后用LLL求解），以及带LLL预约简的CVP前端
+
+不依赖tkinter/matplotlib，可在批量解码脚本中直接导入；Babai最近向量算法.py的GUI调用本模块
+"""
+import numpy as np
+
+from 格基约简 import LLLStatus, enumerate_cvp, gram_schmidt_qr, lll_reduce, lll_reduce_exact, randomize_basis
+
+
+class BabaiSolver:
+    """对同一个格基预计算一次Gram-Schmidt数据，之后对任意多个目标做向量化的Babai最近平面解码
+
+    basis的每一行是一个基向量（n×d，n≤d，行线性无关）
+    """
+
+    def __init__(self, basis):
+        self.basis = np.array(basis, dtype=np.float64)
+        if self.basis.ndim != 2 or len(self.basis) > self.basis.shape[1]:
+            raise ValueError("格基必须是n×d矩阵（n≤d），每行一个基向量")
+        self.ortho, self.mu, self.bb = gram_schmidt_qr(self.basis)
+        if np.any(self.bb <= 1e-24 * np.max(self.bb, initial=0.0)):
+            raise ValueError("基向量线性相关")
+
+    def projections(self, targets):
+        """y_j = <t, b*_j>/‖b*_j‖²：目标在各正交方向上的坐标（每个目标一行）"""
+        return np.atleast_2d(np.asarray(targets, dtype=np.float64)) @ self.ortho.T / self.bb
+
+    def coefficients(self, targets):
+        """返回最近平面法给出的整数系数a（每个目标一行），使 a @ basis 接近目标
+
+        从最后一维开始取 a_i = round(y_i)，减去 a_i·b_i 只改变前面的坐标：y_j -= a_i·μ_ij（j < i）。
+        对全部目标同时进行
+        """
+        single = np.ndim(targets) == 1
+        y = self.projections(targets)
+        a = np.zeros_like(y)
+        for i in range(len(self.bb) - 1, -1, -1):
+            a[:, i] = np.rint(y[:, i])
+            y[:, :i] -= a[:, i, None] * self.mu[i, :i]
+        return a[0] if single else a
+
+    def solve(self, targets):
+        """最近格向量：targets为一维（单个目标）或m×d数组，返回同形状的格向量"""
+        return self.coefficients(targets) @ self.basis
+
+    def enumerate(self, target, pruning=None, radius2=None):
+        """Schnorr–Euchner枚举求单个目标的精确最近向量，半径从Babai距离开始（第一片叶子就是Babai解）
+
+        返回 (整数系数, 枚举节点数)；给出pruning时（见linear_pruning）可能只是近似解。
+        给出radius2（到目标的平方距离上界）且比Babai距离更小时只找比它更近的向量，找不到返回 (None, 节点数)
+        """
+        t = np.asarray(target, dtype=np.float64)
+        y = self.projections(t)[0]
+        a = self.coefficients(t)
+        # 目标在格张成空间内的部分到Babai解的平方距离
+        c = y.copy()
+        inner2 = 0.0
+        for i in range(len(self.bb) - 1, -1, -1):
+            inner2 += (c[i] - a[i]) ** 2 * self.bb[i]
+            c[:i] -= a[i] * self.mu[i, :i]
+        initial = a
+        if radius2 is not None:
+            # 张成空间外的部分对所有格向量相同，总距离之差就是空间内距离之差
+            shrink = float(np.sum((t - a @ self.basis) ** 2)) - radius2
+            if shrink > 0:
+                inner2, initial = inner2 - shrink, None
+        x, _, nodes = enumerate_cvp(self.mu, self.bb, y, inner2 * (1 + 1e-9), initial=initial, pruning=pruning)
+        return (None if x is None else np.array(x, dtype=np.float64)), nodes
+
+    def shortest_vector(self, pruning=None):
+        """精确SVP：排除零向量的枚举，初始半径取最短的基向量。返回 (最短格向量, 枚举节点数)"""
+        radius2 = float(np.min(np.sum(self.basis ** 2, axis=1))) * (1 + 1e-9)
+        x, _, nodes = enumerate_cvp(self.mu, self.bb, np.zeros(len(self.bb)), radius2, pruning=pruning, svp=True)
+        if x is None:  # 最短的基向量本身就是最短向量
+            return self.basis[np.argmin(np.sum(self.basis ** 2, axis=1))].copy(), nodes
+        return np.array(x, dtype=np.float64) @ self.basis, nodes
+
+
+def linear_pruning(n):
+    """线性剪枝系数：第k层（已固定k个系数）的半径平方取 R²·k/n（Gama–Nguyen–Regev）
+
+    单次剪枝枚举只以一定概率找到最近向量；配合CVPSolver的trials在重新随机化的格基上重复枚举（极端剪枝）
+    """
+    return [k / n for k in range(1, n + 1)]
+
+
+def kannan_embedding(basis, target, factor):
+    """Kannan嵌入格基：[[B, 0], [t, M]]，(n+1)×(d+1)
+
+    格中含 (t - v, M)（v为任意格向量），t离格很近时它是最短向量之一，LLL即可找到
+    """
+    B = np.asarray(basis)
+    integral = all(float(x).is_integer() for x in np.ravel(target)) and float(factor).is_integer()
+    dtype = B.dtype if integral and B.dtype.kind in "iuO" else np.float64
+    E = np.zeros((len(B) + 1, B.shape[1] + 1), dtype=dtype)
+    E[:-1, :-1] = B
+    E[-1, :-1] = target
+    E[-1, -1] = factor
+    return E
+
+
+def _needs_exact(B):
+    """整数格基元素达到2^53时浮点Gram-Schmidt已不可靠，预约简改用精确整数LLL"""
+    return B.dtype.kind in "iuO" and max((abs(int(x)) for x in B.ravel()), default=0) >= 2 ** 53
+
+
+def _exact_coefficients(a, U):
+    """a·U按Python整数精确计算（U可能含超出int64或2^53的元素），结果能放入int64时转回int64"""
+    c = np.rint(a).astype(np.int64).astype(object) @ np.asarray(U).astype(object)
+    return c.astype(np.int64) if max((abs(x) for x in np.ravel(c)), default=0) < 2 ** 63 else c
+
+
+CVP_MODES = ("rounding", "nearest_plane", "enumerate", "embedding")
+
+
+class CVPResult:
+    """CVP解码结果：格向量、相对原格基的整数系数、到目标的欧氏距离、所用模式、是否先做了LLL约简，
+    以及枚举模式的节点数（其他模式为None）
+
+    单个目标时vector/coefficients为一维数组、distance为浮点数；多个目标时按行对应
+    """
+
+    def __init__(self, vector, coefficients, distance, mode, reduced, nodes=None):
+        self.vector = vector
+        self.coefficients = coefficients
+        self.distance = distance
+        self.mode = mode
+        self.reduced = reduced
+        self.nodes = nodes
+
+    def __repr__(self):
+        return (f"CVPResult(mode={self.mode!r}, reduced={self.reduced}, distance={self.distance}"
+                + (f", nodes={self.nodes}" if self.nodes is not None else "") + ")")
+
+
+class CVPSolver:
+    """CVP前端：可选先LLL约简格基（缓存约简后的格基与幺模变换U），再用Babai取整或最近平面法解码
+
+    整数格基原样约简（元素达到2^53时用精确整数LLL），只有约简结果转为浮点供解码使用；
+    预约简中止（精度不足等）时reduced为False
+
+    mode="rounding"：a = round(t·B⁺)，每个目标一次线性求解，最快；
+    mode="nearest_plane"：Babai最近平面，误差界更好。两者在约简后的格基上都明显更准；
+    mode="enumerate"：从Babai距离开始的Schnorr–Euchner枚举，给出精确最近向量（约40维以内可行），
+    pruning见linear_pruning，trials>1时做极端剪枝（见pruned_enumerate）；
+    mode="embedding"：Kannan嵌入后LLL（约简后的格基在前，从目标行开始增量约简），嵌入因子M自动选取，
+    结果不比最近平面差
+    """
+
+    def __init__(self, basis, reduce=True, delta=0.99):
+        exact = np.asarray(basis)
+        self.basis = np.array(exact, dtype=np.float64)
+        self.reduce_status = None
+        if reduce:
+            if _needs_exact(exact):
+                exact, swaps, self.transform = lll_reduce_exact(exact, delta, transform=True)
+                self.reduce_status = LLLStatus()
+                self.reduce_status.reduced = True
+                self.reduce_status.swaps = swaps
+                self.reduce_status.transform = self.transform
+            else:
+                exact, self.reduce_status = lll_reduce(exact, delta, transform=True)
+                self.transform = self.reduce_status.transform
+        else:
+            self.transform = np.eye(len(self.basis), dtype=np.int64)
+        self.reduced = self.reduce_status is not None and self.reduce_status.reduced  # 预约简中止时为False
+        self.reduced_basis = np.array(exact, dtype=np.float64)
+        self._exact_basis = exact  # 嵌入模式在精确的（整数）约简格基上构造嵌入格
+        self._babai = BabaiSolver(self.reduced_basis)
+        self._pinv = None  # 取整、嵌入模式首次使用时计算
+        self._delta = delta
+        self._integral = exact.dtype.kind in "iuO" or bool(np.all(self.reduced_basis == np.round(self.reduced_basis)))
+
+    def _solve_linear(self, vectors):
+        """格向量（或近似格向量）在约简后格基下的系数：一次乘以缓存的伪逆后取整"""
+        if self._pinv is None:
+            self._pinv = np.linalg.pinv(self.reduced_basis)
+        return np.rint(np.asarray(vectors, dtype=np.float64) @ self._pinv)
+
+    def embedding_factor(self, target):
+        """自动选取嵌入因子M：Babai误差向量每个分量均方根的1/4（整数格取整且至少为1）
+
+        嵌入失败多发生在Babai也失败时，此时Babai误差约为真实误差的2~3倍；M不超过真实误差的典型分量时
+        (e, M)最短、成功率最高（q元格上的实测M=1~2最好，M再大成功率明显下降）
+        """
+        t = np.asarray(target, dtype=np.float64)
+        rms = np.linalg.norm(t - self._babai.solve(t)) / np.sqrt(len(t))
+        if self._integral and np.all(t == np.round(t)):
+            return max(1.0, float(np.round(rms / 4)))
+        return rms / 4 if rms > 0 else 1.0
+
+    def embed(self, target, factor=None):
+        """Kannan嵌入求单个目标的最近向量系数；找不到 |最后一维| = M 的行或结果不如最近平面时返回最近平面的解"""
+        t = np.asarray(target, dtype=np.float64)
+        factor = factor or self.embedding_factor(t)
+        babai = self._babai.coefficients(t)
+        E = kannan_embedding(self._exact_basis, t, factor)
+        reduced, _ = lll_reduce(E, self._delta, start=len(self._exact_basis) if self.reduced else 1)
+        reduced = np.asarray(reduced, dtype=np.float64)
+        rows = reduced[np.abs(np.abs(reduced[:, -1]) - factor) < 1e-9 * max(1.0, factor)]
+        if not len(rows):
+            return babai
+        row = rows[np.argmin(np.sum(rows[:, :-1] ** 2, axis=1))]
+        v = t - np.sign(row[-1]) * row[:-1]  # 行为 ±(t - v, M)
+        a = self._solve_linear(v)
+        if np.linalg.norm(t - a @ self.reduced_basis) > np.linalg.norm(t - babai @ self.reduced_basis):
+            return babai
+        return a
+
+    def pruned_enumerate(self, target, pruning=None, trials=8, seed=0):
+        """极端剪枝（Gama–Nguyen–Regev）：在重新随机化并LLL约简的格基上重复剪枝枚举，
+        返回 (约简后格基下的整数系数, 各次枚举的节点总数)
+
+        每次剪枝枚举只以一定概率找到最近向量，而不同的约简基剪掉的是不同的分支，重复后漏掉的概率随trials下降。
+        第一次用约简后的格基本身（半径为Babai距离），之后每次半径取目前最近的距离，只接受更近的向量；
+        pruning默认linear_pruning，seed固定随机化使结果可复现
+        """
+        t = np.asarray(target, dtype=np.float64)
+        if pruning is None:
+            pruning = linear_pruning(len(self.reduced_basis))
+        best, nodes = self._babai.enumerate(t, pruning)
+        dist2 = float(np.sum((t - best @ self.reduced_basis) ** 2))
+        rng = np.random.default_rng(seed)
+        for _ in range(trials - 1):
+            basis = randomize_basis(self._exact_basis, rng)
+            if _needs_exact(basis):
+                basis, _ = lll_reduce_exact(basis, self._delta)
+            else:
+                basis, status = lll_reduce(basis, self._delta)
+                if not status.reduced:
+                    continue
+            basis = np.array(basis, dtype=np.float64)
+            x, count = BabaiSolver(basis).enumerate(t, pruning, radius2=dist2)
+            nodes += count
+            if x is None:
+                continue
+            a = self._solve_linear(x @ basis)
+            d = float(np.sum((t - a @ self.reduced_basis) ** 2))
+            if d < dist2:
+                best, dist2 = a, d
+        return best, nodes
+
+    def coefficients(self, targets, mode="nearest_plane", pruning=None, trials=1):
+        """约简后格基下的整数系数（每个目标一行）；枚举模式返回 (系数, 各目标的节点数)"""
+        if mode == "nearest_plane":
+            return self._babai.coefficients(targets)
+        if mode == "enumerate":
+            T = np.atleast_2d(np.asarray(targets, dtype=np.float64))
+            if trials > 1:
+                results = [self.pruned_enumerate(t, pruning, trials) for t in T]
+            else:
+                results = [self._babai.enumerate(t, pruning) for t in T]
+            a = np.array([x for x, _ in results])
+            nodes = np.array([count for _, count in results])
+            return (a[0], int(nodes[0])) if np.ndim(targets) == 1 else (a, nodes)
+        if mode == "rounding":
+            return self._solve_linear(targets)
+        if mode == "embedding":
+            T = np.atleast_2d(np.asarray(targets, dtype=np.float64))
+            a = np.array([self.embed(t) for t in T])
+            return a[0] if np.ndim(targets) == 1 else a
+        raise ValueError(f"未知的CVP模式: {mode}")
+
+    def solve(self, targets, mode="nearest_plane", pruning=None, trials=1):
+        """解码一个（一维）或多个（m×d）目标，返回CVPResult"""
+        T = np.asarray(targets, dtype=np.float64)
+        nodes = None
+        if mode == "enumerate":
+            a, nodes = self.coefficients(T, mode, pruning, trials)
+        else:
+            a = self.coefficients(T, mode)
+        vector = a @ self.reduced_basis
+        distance = np.linalg.norm(T - vector, axis=-1)
+        return CVPResult(vector, _exact_coefficients(a, self.transform), distance, mode, self.reduced, nodes)
+
+    def shortest_vector(self, pruning=None):
+        """约简后格的精确最短向量，返回 (向量, 枚举节点数)"""
+        return self._babai.shortest_vector(pruning)
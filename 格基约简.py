@@ -0,0 +1,1109 @@
+"""格基约简核心：Gram-Schmidt、Hadamard比率、约简检查与各种LLL/BKZ约简算法
+
+不依赖tkinter，可在批处理脚本和子进程中直接导入；LLL算法.py与背包问题GUI均调用本模块
+"""
+import math
+import numpy as np
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+
+
+def gram_schmidt_qr(B):
+    """Householder QR一次得到全部Gram-Schmidt数据，返回 (B*, μ, ‖b*_i‖²)
+
+    B^T = QR，则 b*_i = R_ii·q_i，μ_ij = R_ji / R_jj，‖b*_i‖² = R_ii²
+    """
+    B = np.array(B, dtype=np.float64)
+    with np.errstate(over="ignore", invalid="ignore"):  # 超大整数格基的溢出由调用方按非有限值处理
+        Q, R = np.linalg.qr(B.T)
+    diag = np.diag(R).copy()
+    zero = np.abs(diag) < 1e-12  # 零向量（线性相关）处μ取0
+    mu = (R / np.where(zero, 1.0, diag)[:, None]).T
+    mu[:, zero] = 0.0
+    np.fill_diagonal(mu, 1.0)
+    B_star = (Q * diag).T
+    with np.errstate(over="ignore"):
+        return B_star, mu, diag ** 2
+
+
+def gso_coefficients(B):
+    """计算Gram-Schmidt系数矩阵μ（单位下三角）与平方范数‖b*_i‖²
+
+    默认用QR；整数格基若估计的舍入误差过大（大动态范围，如背包格），
+    改用精确整数Gram-Schmidt再转为浮点，避免相消误差
+    """
+    _, mu, bb = gram_schmidt_qr(B)
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        norms = np.linalg.norm(np.array(B, dtype=np.float64), axis=1)
+        scale = len(B) * 2.0 ** -53 * norms  # Householder QR第i行的后向误差量级
+        mu_error = np.tril(scale[:, None] / np.sqrt(bb)[None, :], -1)
+        bb_error = scale ** 2 / bb
+    if np.all(np.isfinite(bb)) and max(np.max(mu_error, initial=0.0), np.max(bb_error, initial=0.0)) < 2.0 ** -20:
+        return mu, bb
+
+    try:
+        d, lam = _integral_gso(_to_int_rows(B))
+    except ValueError:  # 非整数或线性相关，只能使用QR结果
+        return mu, bb
+
+    n = len(B)
+    mu = np.eye(n)
+    bb = np.zeros(n)
+    for i in range(n):
+        bb[i] = _ratio(d[i + 1], d[i])  # 整数真除法结果正确舍入
+        for j in range(i):
+            mu[i, j] = _ratio(lam[i][j], d[j + 1])
+    return mu, bb
+
+
+def _ratio(a, b):
+    """整数相除转浮点（正确舍入），超出浮点范围时返回inf"""
+    try:
+        return a / b
+    except OverflowError:
+        return float("inf") if (a < 0) == (b < 0) else float("-inf")
+
+
+def hadamard_ratio(B):
+    """Hadamard比率 (det / ∏‖b_i‖)^(1/n)，取对数避免大整数格基溢出"""
+    B = np.array(B, dtype=np.float64)
+    _, _, bb = gram_schmidt_qr(B)
+    log_det = 0.5 * np.sum(np.log(np.maximum(bb, 1e-20)))  # 防止零向量
+    log_norms = np.sum(np.log(np.maximum(np.linalg.norm(B, axis=1), 1e-10)))
+    return float(np.exp((log_det - log_norms) / len(B)))
+
+
+def is_lll_reduced(B, delta=0.75):
+    """后验验证：尺寸约减 |μ_kj| ≤ 1/2 与Lovász条件，全部以向量化方式检查"""
+    try:
+        mu, bb = gso_coefficients(B)
+    except (ValueError, np.linalg.LinAlgError):
+        return False
+    n = len(bb)
+    if np.any(np.abs(mu[np.tril_indices(n, -1)]) > 0.5 + 1e-9):
+        return False
+    sub = np.diagonal(mu, -1)
+    lhs = bb[1:]
+    rhs = (delta - sub ** 2) * bb[:-1]
+    return bool(np.all((lhs >= rhs - 1e-6) | (bb[:-1] < 1e-10)))
+
+
+_INT64_ENTRY_LIMIT = 2 ** 40  # int64存储的格基元素上界，留出尺寸约减的增长余量
+
+
+def parse_number(text):
+    """解析一个格基或重量元素：整数按原样保留（大整数不丢失精度），否则按浮点解析，都不是时抛出ValueError"""
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _as_basis(B):
+    """整数格基存为int64（元素绝对值 < 2^40）或Python整数object数组，非整数格基存为float64
+
+    只有Gram-Schmidt数据使用浮点，整数格基的行更新全程精确；总是返回新数组
+    """
+    A = np.asarray(B)
+    if A.dtype.kind == "f" and not (np.all(np.isfinite(A)) and np.all(A == np.round(A))):
+        return np.array(A, dtype=np.float64)
+    try:
+        rows = _to_int_rows(A)
+    except (ValueError, TypeError, OverflowError):
+        return np.array(A, dtype=np.float64)
+    if max((abs(x) for row in rows for x in row), default=0) < _INT64_ENTRY_LIMIT:
+        return np.array(rows, dtype=np.int64).reshape(A.shape)
+    B = np.empty(A.shape, dtype=object)
+    B[:] = rows
+    return B
+
+
+def _float_range_error(B, hint="请使用精确模式"):
+    """浮点LLL无法处理的格基返回原因说明，否则返回空串
+
+    float64元素超过2^53时已不精确；大整数（object）格基的‖b_i‖²两两相乘（交换时更新‖b*_i‖²）
+    超出float64范围时μ、‖b*_i‖²会变成inf/nan
+    """
+    if B.dtype == np.float64 and np.max(np.abs(B), initial=0.0) >= 2 ** 53:
+        return f"格基元素超过2^53，浮点无法精确表示（{hint}）"
+    if B.dtype == object:
+        bound = max((abs(int(x)) for x in B.ravel()), default=0) ** 2 * B.shape[1]  # ‖b_i‖²的上界
+        if bound.bit_length() > 511:
+            return f"格基元素过大，‖b_i‖²的乘积超出浮点范围（{hint}）"
+    return ""
+
+
+def _size_reduce(B, mu, k, U=None):
+    """尺寸约减第k行：一次后向扫描求出全部取整系数并原地更新μ的第k行，
+    再用一次矩阵-向量乘法把整数组合作用到B[k]（及U[k]）上
+
+    扫描只在 |μ_kj| > 1/2 的位置停留（向量化查找），不再逐个j做Python循环。
+    整数存储（int64/object）时组合系数为整数、更新精确；int64可能溢出或元素超出2^40时
+    先转为Python整数object数组（U同样处理）。返回 (B, U（都可能是新数组）, 所用系数的最大绝对值)
+    """
+    idx, coeffs = _rounding_sweep(mu, k)
+    if not idx:
+        return B, U, 0
+    B = _subtract_rows(B, k, idx, coeffs)
+    if U is not None:
+        U = _subtract_rows(U, k, idx, coeffs)
+    return B, U, max(abs(q) for q in coeffs)
+
+
+def _rounding_sweep(mu, k):
+    """一次后向扫描：求出使 |μ_kj| ≤ 1/2 的全部取整系数，并原地更新μ的第k行（μ的对角线须为1）
+
+    只在 |μ_kj| > 1/2 的位置停留（向量化查找）。返回 (行号列表, Python整数系数列表)
+    """
+    row = mu[k]
+    idx = []
+    coeffs = []
+    j = k
+    while True:
+        big = (np.abs(row[:j]) > 0.5 + 1e-6).nonzero()[0]  # 增加容错阈值
+        if not len(big):
+            break
+        j = int(big[-1])
+        q = round(float(row[j]))  # Python整数，与np.round同为四舍六入五成双
+        row[:j + 1] -= q * mu[j, :j + 1]  # 对角线为1，同时完成 μ_kj -= q
+        idx.append(j)
+        coeffs.append(q)
+    return idx, coeffs
+
+
+def _subtract_rows(B, k, idx, coeffs):
+    """B[k] -= Σ coeffs_i·B[idx_i]；int64可能溢出或元素超出2^40时先转为object数组。返回（可能是新的）B"""
+    if B.dtype == np.float64:
+        B[k] -= np.array(coeffs, dtype=np.float64) @ B[idx]
+        return B
+    checked = False
+    if B.dtype == np.int64:
+        bound = sum(abs(q) for q in coeffs) * int(np.max(np.abs(B[idx]))) + int(np.max(np.abs(B[k])))
+        checked = bound < _INT64_ENTRY_LIMIT
+        if bound >= 2 ** 62:
+            B = B.astype(object)
+    if B.dtype == np.int64:
+        B[k] -= np.array(coeffs, dtype=np.int64) @ B[idx]
+        if not checked and np.max(np.abs(B[k])) >= _INT64_ENTRY_LIMIT:
+            B = B.astype(object)
+    else:
+        B[k] -= np.array(coeffs, dtype=object) @ B[idx]
+    return B
+
+
+def _swap(B, mu, bb, k, U=None):
+    """交换b_{k-1}与b_k，只更新受影响的μ行列与平方范数"""
+    B[[k - 1, k]] = B[[k, k - 1]]
+    if U is not None:
+        U[[k - 1, k]] = U[[k, k - 1]]
+    m = mu[k, k - 1]
+    b_new = bb[k] + m * m * bb[k - 1]
+    mu[[k - 1, k], :k - 1] = mu[[k, k - 1], :k - 1]
+
+    if b_new < 1e-12:  # 交换后的b*_{k-1}为零向量
+        m = 0.0
+        mu[k, k - 1] = 0.0
+        bb[k - 1], bb[k] = b_new, bb[k - 1]
+    else:
+        mu[k, k - 1] = m * bb[k - 1] / b_new
+        bb[k] = bb[k - 1] * bb[k] / b_new
+        bb[k - 1] = b_new
+
+    # 更新k之后各行的第k-1、k列
+    t = mu[k + 1:, k].copy()
+    mu[k + 1:, k] = mu[k + 1:, k - 1] - m * t
+    mu[k + 1:, k - 1] = t + mu[k, k - 1] * mu[k + 1:, k]
+
+
+class LLLStatus:
+    """LLL约简状态：迭代/交换次数、各阶段势函数下降量、是否满足LLL条件"""
+
+    def __init__(self):
+        self.iterations = 0
+        self.swaps = 0
+        self.initial_log_potential = 0.0  # log D，D = ∏ d_i，d_i = ∏_{j<i} ‖b*_j‖²
+        self.log_potential = 0.0
+        self.phase_decrease = []  # 第i个阶段（k首次到达i+2）内log D的下降量
+        self.reduced = False  # 正常结束：每一行都满足尺寸约减与Lovász条件
+        self.reason = ""
+        self.stopped_at = None  # 因stop_when提前结束时满足条件的行号
+        self.transform = None  # transform=True时的幺模变换U
+
+    def __repr__(self):
+        return (f"LLLStatus(reduced={self.reduced}, iterations={self.iterations}, swaps={self.swaps}, "
+                f"potential_decrease={self.initial_log_potential - self.log_potential:.4f}, "
+                f"reason={self.reason!r})")
+
+
+def _log_potential(bb):
+    """log D = Σ (n-i)·log‖b*_i‖²，零向量按极小值计"""
+    n = len(bb)
+    return float(np.dot(np.arange(n, 0, -1), np.log(np.maximum(bb, 1e-300))))
+
+
+def lll_reduce(B, delta=0.99, checkpoint=None, checkpoint_seconds=60.0, checkpoint_swaps=None, stats=None,
+               progress=None, cancel=None, stop_when=None, start=1, transform=False):
+    """增量LLL约简：μ与‖b*_i‖²原地更新，不再每步重算Gram-Schmidt
+
+    终止由势函数保证：每次交换log D至少下降 -log δ，整数格基的 log D ≥ 0，
+    因此交换次数不超过 log D_0 / (-log δ)；超出该界或势函数不再下降时停止并在状态中说明。
+    checkpoint给出.npz路径时，每隔checkpoint_seconds秒或checkpoint_swaps次交换保存一次进度，
+    进程中断后可用resume_lll继续。stats为ReductionStats时记录各部分耗时与计数。
+    progress(k, 交换次数, log D)定期被调用；cancel（如threading.Event）被置位时停止并返回部分约简的格基。
+    stop_when(行向量)对初始各行及每次尺寸约减改变的行求值，为真时立即停止（status.stopped_at为该行号）。
+    前start行已经LLL约简时（如在约简好的子格后追加新行）从第start行开始，跳过前面的检查。
+    transform=True时同步记录幺模变换U（约简后的格基 = U·原格基），保存在status.transform中；
+    U与整数格基一样存为int64，元素可能超出2^40时转为Python整数object数组。
+    整数格基以int64/Python整数精确存储（见_as_basis），只有μ与‖b*_i‖²为浮点。
+    返回 (约简后的格基, LLLStatus)
+    """
+    B = _as_basis(B)
+    status = LLLStatus()
+    U = status.transform = np.eye(len(B), dtype=np.int64) if transform else None
+    status.reason = _float_range_error(B)
+    if status.reason:
+        return B, status
+
+    if stop_when is not None:
+        for i, row in enumerate(B):
+            if stop_when(row):
+                status.stopped_at = i
+                status.reason = STOPPED
+                return B, status
+
+    mu, bb = _timed_gso(B, stats)
+    status.initial_log_potential = _log_potential(bb)
+    saver = _Checkpoint(checkpoint, delta, checkpoint_seconds, checkpoint_swaps) if checkpoint else None
+    B = _lll_loop(B, mu, bb, delta, status, k=max(start, 1), U=U, checkpoint=saver, stats=stats, progress=progress,
+                  cancel=cancel, stop_when=stop_when)
+    return B, status
+
+
+class ReductionStats:
+    """约简热路径统计：尺寸约减、Lovász检查、交换与正交化的耗时，GSO重算次数，见到的最大|μ|
+
+    作为stats参数传入约简函数时才会计时；不传（None）时主循环只多一次判断
+    """
+
+    def __init__(self):
+        self.size_reduction_time = 0.0
+        self.lovasz_time = 0.0
+        self.swap_time = 0.0
+        self.gso_time = 0.0  # 初始与重算Gram-Schmidt（QR或精确整数）的耗时
+        self.gso_recomputations = 0
+        self.lovasz_tests = 0
+        self.max_mu = 0.0  # 尺寸约减前见到的最大|μ_kj|
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def __repr__(self):
+        return "ReductionStats(" + ", ".join(
+            f"{name}={value:.4f}" if isinstance(value, float) else f"{name}={value}"
+            for name, value in vars(self).items()) + ")"
+
+
+_PROGRESS_INTERVAL = 64  # 进度回调与取消检查的迭代间隔
+CANCELLED = "已取消"
+STOPPED = "满足停止条件，提前结束"
+
+
+def _timed_gso(B, stats):
+    """gso_coefficients，stats不为None时累计耗时"""
+    if stats is None:
+        return gso_coefficients(B)
+    start = time.perf_counter()
+    mu, bb = gso_coefficients(B)
+    stats.gso_time += time.perf_counter() - start
+    return mu, bb
+
+
+class _Checkpoint:
+    """LLL进度检查点：按时间或交换次数间隔把格基、k、计数与GSO数据写入.npz
+
+    先写临时文件再os.replace，中途崩溃不会留下损坏的检查点
+    """
+
+    def __init__(self, path, delta, seconds=60.0, swaps=None):
+        self.path = path
+        self.delta = delta
+        self.seconds = seconds
+        self.swaps = swaps
+        self.last_time = time.time()
+        self.last_swaps = 0
+
+    def due(self, status):
+        if self.swaps is not None and status.swaps - self.last_swaps >= self.swaps:
+            return True
+        return self.seconds is not None and time.time() - self.last_time >= self.seconds
+
+    def save(self, B, mu, bb, k, status):
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, B=B, mu=mu, bb=bb, k=k, delta=self.delta, swaps=status.swaps,
+                     iterations=status.iterations, initial_log_potential=status.initial_log_potential,
+                     phase_decrease=np.array(status.phase_decrease, dtype=np.float64), reduced=status.reduced)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.last_time = time.time()
+        self.last_swaps = status.swaps
+
+
+def resume_lll(path, checkpoint_seconds=60.0, checkpoint_swaps=None):
+    """从lll_reduce写出的检查点继续约简，之后的进度仍保存到同一文件
+
+    返回 (约简后的格基, LLLStatus)；检查点已是完成状态时直接返回
+    """
+    with np.load(path, allow_pickle=True) as data:  # 大整数格基以object数组保存
+        B = data["B"].copy()
+        mu = data["mu"].copy()
+        bb = data["bb"].copy()
+        k = int(data["k"])
+        delta = float(data["delta"])
+        status = LLLStatus()
+        status.swaps = int(data["swaps"])
+        status.iterations = int(data["iterations"])
+        status.initial_log_potential = float(data["initial_log_potential"])
+        status.phase_decrease = data["phase_decrease"].tolist()
+        status.reduced = bool(data["reduced"])
+
+    if status.reduced:
+        status.log_potential = _log_potential(bb)
+        return B, status
+    saver = _Checkpoint(path, delta, checkpoint_seconds, checkpoint_swaps)
+    saver.last_swaps = status.swaps
+    B = _lll_loop(B, mu, bb, delta, status, k=k, checkpoint=saver)
+    return B, status
+
+
+def _lll_loop(B, mu, bb, delta, status, k=1, U=None, checkpoint=None, stats=None, progress=None, cancel=None,
+              stop_when=None):
+    """LLL主循环：原地约简B并维护μ、‖b*_i‖²，要求前k行已满足LLL条件
+
+    U不为None时同步记录幺模变换（约简后的B = U·原B，可能转为object数组，结束时存入status.transform）；checkpoint为_Checkpoint时定期保存进度；
+    stats为ReductionStats时记录各部分耗时；每_PROGRESS_INTERVAL次迭代调用progress并检查cancel；
+    stop_when(行向量)在尺寸约减改变第k行后求值，为真时停止。
+    int64格基可能在途中转为object数组，因此返回（可能是新的）格基数组
+    """
+    n = len(B)
+    log_d = _log_potential(bb)
+    min_decrease = -np.log(delta)  # 每次交换势函数的最小下降量
+    swap_bound = None
+    if B.dtype != np.float64 and np.isfinite(log_d):  # 整数格基：d_i ≥ 1
+        swap_bound = status.swaps + int(np.ceil(max(log_d, 0.0) / min_decrease)) + n
+
+    k = max(k, 1)
+    k_max = k
+    phase_start = log_d
+    status.reduced = False
+    while k < n:
+        if checkpoint is not None and checkpoint.due(status):
+            checkpoint.save(B, mu, bb, k, status)
+        status.iterations += 1
+        if (progress is not None or cancel is not None) and status.iterations % _PROGRESS_INTERVAL == 0:
+            if cancel is not None and cancel.is_set():
+                status.reason = CANCELLED
+                break
+            if progress is not None:
+                progress(k, status.swaps, float(log_d))
+        if stats is not None:
+            stats.max_mu = max(stats.max_mu, float(np.max(np.abs(mu[k, :k]))))
+            start = time.perf_counter()
+        B, U, max_q = _size_reduce(B, mu, k, U)
+        if stats is not None:
+            stats.size_reduction_time += time.perf_counter() - start
+        if stop_when is not None and max_q and stop_when(B[k]):
+            status.stopped_at = k
+            status.reason = STOPPED
+            break
+        if max_q > 2 ** 26:  # 系数过大时增量更新丢失一半有效位，重算GSO
+            mu[:], bb[:] = _timed_gso(B, stats)
+            if stats is not None:
+                stats.gso_recomputations += 1
+            recomputed = _log_potential(bb)
+            if not np.isfinite(recomputed) or recomputed > log_d + 1e-6 * max(1.0, abs(log_d)):
+                log_d = recomputed
+                status.reason = "重算后势函数上升（浮点精度不足，请使用精确模式）"
+                break
+            log_d = recomputed
+
+        # Lovász条件检查（零向量直接跳过）
+        if stats is not None:
+            start = time.perf_counter()
+        lovasz = bb[k - 1] < 1e-10 or bb[k] >= (delta - mu[k, k - 1] ** 2) * bb[k - 1] - 1e-6  # 增加容错
+        if stats is not None:
+            stats.lovasz_time += time.perf_counter() - start
+            stats.lovasz_tests += 1
+        if lovasz:
+            k += 1
+            if k > k_max:  # 前k个向量已约简，一个阶段结束
+                status.phase_decrease.append(phase_start - log_d)
+                phase_start = log_d
+                k_max = k
+            continue
+
+        old = bb[k - 1]
+        if stats is not None:
+            start = time.perf_counter()
+        _swap(B, mu, bb, k, U)
+        if stats is not None:
+            stats.swap_time += time.perf_counter() - start
+        status.swaps += 1
+        decrease = np.log(old) - np.log(max(bb[k - 1], 1e-300))
+        log_d -= decrease
+        k = max(k - 1, 1)
+
+        if not np.isfinite(decrease) or decrease < 0.5 * min_decrease:
+            status.reason = "势函数未按预期下降（数值误差过大）"
+            break
+        if swap_bound is not None and status.swaps > swap_bound:
+            status.reason = "交换次数超过势函数上界"
+            break
+    else:
+        status.reduced = True
+
+    status.log_potential = log_d
+    if U is not None:
+        status.transform = U
+    if checkpoint is not None:
+        checkpoint.save(B, mu, bb, k, status)
+    return B
+
+
+def _gso_rows(B, mu, bb, start):
+    """从第start行起重算Gram-Schmidt数据（一次QR，前start行保持不变）"""
+    _, mu_new, bb_new = gram_schmidt_qr(B)
+    mu[start:] = mu_new[start:]
+    bb[start:] = bb_new[start:]
+
+
+def _enum_svp(mu, bb, radius2):
+    """Schnorr–Euchner枚举：在投影块中寻找平方范数小于radius2的非零向量
+
+    mu、bb 为块内的Gram-Schmidt数据，即目标为0、排除零向量的enumerate_cvp。
+    返回 (最短向量的整数系数或None, 平方范数, 枚举节点数)
+    """
+    return enumerate_cvp(mu, bb, np.zeros(len(bb)), radius2, svp=True)
+
+
+def enumerate_cvp(mu, bb, y, radius2, initial=None, pruning=None, svp=False):
+    """Schnorr–Euchner枚举：寻找与目标的（投影部分）平方距离小于radius2的格向量
+
+    y_i = <t, b*_i>/‖b*_i‖² 为目标在各正交方向上的坐标（SVP时为0）。按 |x_i - c_i| 递增的锯齿顺序遍历，
+    找到更近的向量即收缩半径；initial为半径radius2对应的已知系数（如Babai解），找不到更近的向量时原样返回。
+    pruning[k-1]（k = 已固定的系数个数，单调不减，最后为1）把第k层的半径缩为 radius2·pruning[k-1]，
+    节点数大幅减少，但可能漏掉最优解。svp=True时排除零向量，并只枚举±v中的一个。
+    返回 (最近向量的整数系数或None, 投影部分的平方距离, 枚举节点数)
+    """
+    n = len(bb)
+    mu = mu.tolist()
+    bb = bb.tolist()
+    y = list(y)
+    bounds = [1.0] * n if pruning is None else [pruning[n - 1 - i] for i in range(n)]
+    x = [0] * n
+    best = [None if initial is None else list(initial), radius2]
+    nodes = 0
+
+    def search(i, partial, top):
+        nonlocal nodes
+        c = y[i] - sum(x[j] * mu[j][i] for j in range(i + 1, n))
+        if svp and top:  # 更高层系数全为0：只枚举非负x_i，去掉±v的重复
+            candidates = _count_from(0)
+        else:
+            candidates = _zigzag(c)
+        for xi in candidates:
+            nodes += 1
+            d = partial + (xi - c) ** 2 * bb[i]
+            if d >= best[1] * bounds[i]:  # 锯齿顺序下后续候选只会更远
+                break
+            x[i] = xi
+            if i > 0:
+                search(i - 1, d, top and xi == 0)
+            elif xi != 0 or not (svp and top):
+                best[0], best[1] = x.copy(), d
+        x[i] = 0
+
+    search(n - 1, 0.0, True)
+    return best[0], best[1], nodes
+
+
+def _zigzag(c):
+    """从round(c)开始左右交替：|x - c| 单调不减"""
+    x = int(round(c))
+    yield x
+    sign = 1 if c >= x else -1
+    step = 1
+    while True:
+        yield x + sign * step
+        yield x - sign * step
+        step += 1
+
+
+def _count_from(x):
+    while True:
+        yield x
+        x += 1
+
+
+def _insert_vector(B, j, x):
+    """把块内整数组合 v = Σ x_i·b_{j+i} 放到第j行（欧几里得消去，保持幺模）"""
+    x = list(x)
+    while True:
+        nonzero = [i for i in range(len(x)) if x[i] != 0]
+        if len(nonzero) == 1:
+            break
+        p = min(nonzero, key=lambda i: abs(x[i]))
+        for i in nonzero:
+            if i != p:
+                q = x[i] // x[p]
+                x[i] -= q * x[p]
+                B[j + p] += q * B[j + i]  # x_i·b_i + x_p·b_p 保持不变
+    p = nonzero[0]
+    if x[p] < 0:
+        B[j + p] = -B[j + p]
+    B[j:j + p + 1] = np.roll(B[j:j + p + 1], 1, axis=0)
+
+
+class BKZStatus(LLLStatus):
+    """BKZ约简状态：在LLLStatus基础上记录每一轮的统计"""
+
+    def __init__(self):
+        super().__init__()
+        self.tours = []  # 每轮: 插入次数、交换次数、枚举节点数、‖b_1‖、耗时
+
+
+def bkz_reduce(B, block_size=10, delta=0.99, max_tours=8, stats=None, progress=None, cancel=None):
+    """BKZ块约简：以增量LLL为基础，逐块用枚举求投影块的最短向量并插入
+
+    某一轮没有任何插入时结束；最多执行max_tours轮（提前终止）。stats只统计其中的LLL部分；
+    progress、cancel同lll_reduce，块之间也会检查取消。
+    返回 (约简后的格基, BKZStatus)
+    """
+    if not 2 <= block_size <= 30:
+        raise ValueError("BKZ块大小须在2到30之间")
+    B = _as_basis(B)
+    status = BKZStatus()
+    status.reason = _float_range_error(B, "请先用精确模式约简")
+    if status.reason:
+        return B, status
+
+    n = len(B)
+    mu, bb = _timed_gso(B, stats)
+    status.initial_log_potential = _log_potential(bb)
+    B = _lll_loop(B, mu, bb, delta, status, stats=stats, progress=progress, cancel=cancel)
+    if not status.reduced:
+        return B, status
+
+    for tour in range(max_tours):
+        start_time = time.time()
+        swaps_before = status.swaps
+        insertions = 0
+        nodes = 0
+        for j in range(n - 1):
+            if cancel is not None and cancel.is_set():
+                status.reduced = False
+                status.reason = CANCELLED
+                return B, status
+            if progress is not None:
+                progress(j, status.swaps, _log_potential(bb))
+            k = min(j + block_size, n)
+            x, norm2, count = _enum_svp(mu[j:k, j:k], bb[j:k], delta * bb[j])
+            nodes += count
+            if x is None:
+                continue
+            if B.dtype == np.int64 and (sum(abs(int(v)) for v in x) * len(x) * int(np.max(np.abs(B[j:k])))
+                                        >= _INT64_ENTRY_LIMIT):  # 插入的欧几里得消去可能溢出int64
+                B = B.astype(object)
+            _insert_vector(B, j, x)
+            _gso_rows(B, mu, bb, j)
+            B = _lll_loop(B, mu, bb, delta, status, k=j, stats=stats, progress=progress, cancel=cancel)
+            insertions += 1
+            if not status.reduced:
+                return B, status
+
+        status.tours.append({
+            "tour": tour + 1,
+            "insertions": insertions,
+            "swaps": status.swaps - swaps_before,
+            "nodes": nodes,
+            "b1_norm": math.sqrt(bb[0]),  # b_1 = b*_1；大整数格基的object行不能直接求范数
+            "time": time.time() - start_time,
+        })
+        if insertions == 0:
+            break
+    else:
+        status.reason = f"达到最大轮数{max_tours}，提前终止"
+    return B, status
+
+
+class DeepLLLStatus(LLLStatus):
+    """深插入LLL状态：在LLLStatus基础上记录深插入次数"""
+
+    def __init__(self):
+        super().__init__()
+        self.insertions = 0
+
+
+def deep_lll_reduce(B, delta=0.99, depth=None, stats=None, progress=None, cancel=None):
+    """深插入LLL：b_k可插入到任意更靠前的位置i（只要能缩短b*_i），插入深度受depth限制
+
+    允许的位置为 i < depth 或 k - i <= depth（depth=None不限制）；i = k-1 即普通的Lovász交换，
+    因此结果总是LLL约简的。先用增量LLL约简，再做深插入。深插入不保证势函数下降，
+    但每次插入都使 (‖b*_0‖², ‖b*_1‖², ...) 按字典序严格下降（‖b*_i‖² 至少乘以δ），以此保证终止。
+    stats只统计其中的LLL部分；progress、cancel同lll_reduce。
+    返回 (约简后的格基, DeepLLLStatus)
+    """
+    B = _as_basis(B)
+    status = DeepLLLStatus()
+    status.reason = _float_range_error(B, "请先用精确模式约简")
+    if status.reason:
+        return B, status
+
+    n = len(B)
+    mu, bb = _timed_gso(B, stats)
+    status.initial_log_potential = _log_potential(bb)
+    B = _lll_loop(B, mu, bb, delta, status, stats=stats, progress=progress, cancel=cancel)
+    if not status.reduced:
+        return B, status
+
+    status.reduced = False
+    k = 1
+    while k < n:
+        status.iterations += 1
+        if (progress is not None or cancel is not None) and status.iterations % _PROGRESS_INTERVAL == 0:
+            if cancel is not None and cancel.is_set():
+                status.reason = CANCELLED
+                break
+            if progress is not None:
+                progress(k, status.swaps + status.insertions, _log_potential(bb))
+        B, _, max_q = _size_reduce(B, mu, k)
+        if max_q > 2 ** 26:
+            mu[:], bb[:] = gso_coefficients(B)
+
+        C = bb[k] + np.dot(mu[k, :k] ** 2, bb[:k])  # ‖b_k‖²
+        i = 0
+        while i < k:
+            allowed = depth is None or i < depth or k - i <= depth
+            if allowed and C < delta * bb[i] - 1e-6:  # 插入到i可缩短b*_i
+                break
+            C -= mu[k, i] ** 2 * bb[i]
+            i += 1
+
+        if i == k:
+            k += 1
+            continue
+
+        old = bb[i]
+        B[i:k + 1] = np.roll(B[i:k + 1], 1, axis=0)
+        _gso_rows(B, mu, bb, i)
+        status.insertions += 1
+        if not bb[i] < delta * old:  # 重算结果与插入判据不符
+            status.reason = "深插入未缩短b*_i（数值误差过大）"
+            break
+        k = max(i, 1)
+    else:
+        status.reduced = True
+
+    status.log_potential = _log_potential(bb)
+    return B, status
+
+
+class SegmentLLLStatus(LLLStatus):
+    """分段LLL状态：在LLLStatus基础上记录每一轮（奇、偶两个阶段）的统计"""
+
+    def __init__(self):
+        super().__init__()
+        self.rounds = []  # 每轮: 处理的块数、块内交换次数、耗时
+        self.workers = 1
+
+
+def _reduce_segment(args):
+    """在子进程中约简一个投影块，只返回整数变换矩阵U与交换次数
+
+    投影块在b*_a..b*_{b-1}的单位正交坐标下为 μ_blk·diag(‖b*‖)，其GSO数据就是μ、‖b*‖²的对应子块
+    """
+    mu, bb, delta = args
+    M = mu * np.sqrt(bb)[None, :]
+    U = np.eye(len(bb), dtype=np.int64)
+    status = LLLStatus()
+    _lll_loop(M, mu, bb, delta, status, U=U)
+    return status.transform, status.swaps
+
+
+def segment_lll_reduce(B, delta=0.99, workers=1, segment_size=None, max_rounds=50, progress=None, cancel=None):
+    """分段（奇偶块并行）LLL：把格基分成若干块，各块的投影格在进程池中并行约简
+
+    偶数阶段处理块 [0,s), [s,2s), ...，奇数阶段整体错开s/2，使块边界处的向量也能交换；
+    父进程把各块的变换U作用到原格基上，重算GSO并对整个格基做尺寸约减。某一轮没有任何块内交换（或达到max_rounds）后，
+    再用增量LLL对整个格基做一次收尾，保证结果满足LLL条件。progress、cancel在每个阶段之后生效。
+    返回 (约简后的格基, SegmentLLLStatus)
+    """
+    B = _as_basis(B)
+    status = SegmentLLLStatus()
+    status.workers = workers
+    status.reason = _float_range_error(B)
+    if status.reason:
+        return B, status
+
+    n = len(B)
+    s = segment_size or max(10, n // (2 * workers))
+    mu, bb = gso_coefficients(B)
+    status.initial_log_potential = _log_potential(bb)
+
+    offsets = [0] if s >= n else [0, s // 2]
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        for round_index in range(max_rounds):
+            start_time = time.time()
+            round_swaps = 0
+            blocks = 0
+            for offset in offsets:
+                bounds = [(a, min(a + s, n)) for a in range(offset, n - 1, s)]
+                if offset:
+                    bounds.insert(0, (0, offset))
+                tasks = [(mu[a:b, a:b].copy(), bb[a:b].copy(), delta) for a, b in bounds]
+                results = executor.map(_reduce_segment, tasks) if executor else map(_reduce_segment, tasks)
+                for (a, b), (U, swaps) in zip(bounds, results):
+                    if swaps:
+                        B = _apply_transform(B, U, a, b)
+                    round_swaps += swaps
+                blocks += len(bounds)
+                if B.dtype == np.float64 and np.max(np.abs(B), initial=0.0) >= 2 ** 53:
+                    status.reason = "分段变换后格基元素超过2^53"
+                    return B, status
+                # 块内变换只对块内尺寸约减，这里对全部行相对前面各块做尺寸约减，防止元素膨胀
+                mu[:], bb[:] = gso_coefficients(B)
+                max_q = 0.0
+                for k in range(1, n):
+                    B, _, q = _size_reduce(B, mu, k)
+                    max_q = max(max_q, q)
+                if max_q > 2 ** 26:
+                    mu[:], bb[:] = gso_coefficients(B)
+                if cancel is not None and cancel.is_set():
+                    status.swaps += round_swaps
+                    status.reason = CANCELLED
+                    status.log_potential = _log_potential(bb)
+                    return B, status
+                if progress is not None:
+                    progress(0, status.swaps + round_swaps, _log_potential(bb))
+
+            status.swaps += round_swaps
+            status.rounds.append({
+                "round": round_index + 1,
+                "blocks": blocks,
+                "swaps": round_swaps,
+                "time": time.time() - start_time,
+            })
+            if round_swaps == 0:
+                break
+    finally:
+        if executor:
+            executor.shutdown()
+
+    B = _lll_loop(B, mu, bb, delta, status, progress=progress, cancel=cancel)
+    return B, status
+
+
+def _apply_transform(B, U, a, b):
+    """B[a:b] = U·B[a:b]；int64可能溢出或超出2^40时先转为object数组。返回（可能是新的）格基"""
+    if B.dtype == np.float64:
+        B[a:b] = U.astype(np.float64) @ B[a:b]
+        return B
+    if B.dtype == np.int64:
+        bound = np.max(np.abs(U).astype(np.float64) @ np.abs(B[a:b]).astype(np.float64))
+        if bound < _INT64_ENTRY_LIMIT:
+            B[a:b] = U @ B[a:b]
+            return B
+        B = B.astype(object)
+    B[a:b] = U.astype(object) @ B[a:b]
+    return B
+
+
+def randomize_basis(B, rng):
+    """随机置换各行后，每行加减两个随机的前面行（左乘随机单位下三角矩阵），格本身不变
+
+    返回object数组（整数格基保持精确）；重新约简后得到同一个格的另一个约简基
+    """
+    B = np.array(B, dtype=object)[rng.permutation(len(B))]
+    for i in range(len(B) - 1, 0, -1):
+        for j in rng.choice(i, size=min(i, 2), replace=False):
+            B[i] = B[i] + int(rng.choice((-1, 1))) * B[j]
+    return B
+
+
+def basis_quality(B):
+    """格基质量：Hermite因子 ‖b_1‖ / det^(1/n) 与 Hadamard比率 (det / ∏‖b_i‖)^(1/n)"""
+    B = np.array(B, dtype=np.float64)
+    _, _, bb = gram_schmidt_qr(B)
+    log_det = 0.5 * np.sum(np.log(np.maximum(bb, 1e-300)))
+    return {
+        "hermite_factor": float(np.exp(np.log(np.linalg.norm(B[0])) - log_det / len(B))),
+        "hadamard_ratio": hadamard_ratio(B),
+    }
+
+
+def _to_int_rows(B):
+    """将格基转为Python整数列表（精确模式要求整数格基）"""
+    rows = []
+    for row in B:
+        int_row = []
+        for x in row:
+            if isinstance(x, (float, np.floating)):
+                if not float(x).is_integer():
+                    raise ValueError("精确模式要求整数格基")
+            int_row.append(int(x))
+        rows.append(int_row)
+    return rows
+
+
+def _integral_gso(b):
+    """整数Gram-Schmidt：d[0]=1，d[i+1]=det(Gram(b_0..b_i))，λ_kj = d_{j+1}·μ_kj"""
+    return _gram_integral_gso(_gram(b), len(b))
+
+
+def _gram(b):
+    """精确整数Gram矩阵（下三角部分）"""
+    return [[sum(x * y for x, y in zip(b[k], b[j])) for j in range(k + 1)] for k in range(len(b))]
+
+
+def _gram_integral_gso(G, n):
+    """由Gram矩阵计算前n个向量的整数Gram-Schmidt数据 (d, λ)"""
+    d = [1] * (n + 1)
+    lam = [[0] * n for _ in range(n)]
+    for k in range(n):
+        for j in range(k + 1):
+            u = G[k][j]
+            for i in range(j):
+                u = (d[i + 1] * u - lam[k][i] * lam[j][i]) // d[i]
+            if j < k:
+                lam[k][j] = u
+            else:
+                d[k + 1] = u
+        if d[k + 1] == 0:
+            raise ValueError("格基向量线性相关")
+    return d, lam
+
+
+def lll_reduce_exact(B, delta=0.99, progress=None, cancel=None, stop_when=None, start=1, transform=False):
+    """精确整数LLL（de Weger / Cohen 整数Gram-Schmidt，仅使用Python整数）
+
+    d_i 为前i个向量Gram矩阵的行列式，λ_kj = d_{j+1}·μ_kj，全程整除无舍入误差。
+    progress、cancel、stop_when、start同lll_reduce；取消或满足stop_when时返回部分约简的格基
+    （调用方通过cancel或对结果各行重新求stop_when判断）。
+    返回 (约简后的格基(object整数数组), 交换次数)；transform=True时再附上幺模变换U
+    （约简后的格基 = U·原格基，object整数数组）
+    """
+    b = _to_int_rows(B)
+    n = len(b)
+    delta = Fraction(str(delta))
+    p, q = delta.numerator, delta.denominator
+    u = [[int(i == j) for j in range(n)] for i in range(n)] if transform else None
+
+    def result(swap_count):
+        if transform:
+            return np.array(b, dtype=object), swap_count, np.array(u, dtype=object)
+        return np.array(b, dtype=object), swap_count
+
+    if stop_when is not None and any(stop_when(np.array(row, dtype=object)) for row in b):
+        return result(0)
+
+    d, lam = _integral_gso(b)
+
+    def reduce(k, l):
+        if 2 * abs(lam[k][l]) > d[l + 1]:
+            r = (2 * lam[k][l] + d[l + 1]) // (2 * d[l + 1])  # 最近整数
+            b[k] = [x - r * y for x, y in zip(b[k], b[l])]
+            if u is not None:
+                u[k] = [x - r * y for x, y in zip(u[k], u[l])]
+            lam[k][l] -= r * d[l + 1]
+            for i in range(l):
+                lam[k][i] -= r * lam[l][i]
+
+    swap_count = 0
+    iterations = 0
+    k = max(start, 1)
+    while k < n:
+        iterations += 1
+        if (progress is not None or cancel is not None) and iterations % _PROGRESS_INTERVAL == 0:
+            if cancel is not None and cancel.is_set():
+                break
+            if progress is not None:
+                progress(k, swap_count, sum(math.log(x) for x in d[1:] if x > 0))  # log D = Σ log d_i
+        reduce(k, k - 1)
+        # Lovász条件：d_{k+1}·d_{k-1} >= δ·d_k² - λ_{k,k-1}²（两边乘以δ的分母）
+        if q * d[k + 1] * d[k - 1] < p * d[k] ** 2 - q * lam[k][k - 1] ** 2:
+            b[k - 1], b[k] = b[k], b[k - 1]
+            if u is not None:
+                u[k - 1], u[k] = u[k], u[k - 1]
+            for j in range(k - 1):
+                lam[k - 1][j], lam[k][j] = lam[k][j], lam[k - 1][j]
+            m = lam[k][k - 1]
+            d_new = (d[k - 1] * d[k + 1] + m * m) // d[k]
+            for i in range(k + 1, n):
+                t = lam[i][k]
+                lam[i][k] = (d[k + 1] * lam[i][k - 1] - m * t) // d[k]
+                lam[i][k - 1] = (d_new * t + m * lam[i][k]) // d[k + 1]
+            d[k] = d_new
+            swap_count += 1
+            k = max(k - 1, 1)
+        else:
+            for l in range(k - 2, -1, -1):
+                reduce(k, l)
+            if stop_when is not None and stop_when(np.array(b[k], dtype=object)):
+                break
+            k += 1
+
+    return result(swap_count)
+
+
+def lll_reduce_l2(B, delta=0.99, eta=0.51, max_passes=8, progress=None, cancel=None):
+    """L2风格浮点LLL（Nguyen–Stehlé）：精确整数Gram矩阵 + 浮点Cholesky + 惰性尺寸约减
+
+    格基按int64/Python整数精确存储（见_as_basis），Gram矩阵G随每次整数组合增量更新（不重算内积）；
+    r、μ为NumPy浮点矩阵，每个阶段由G的第k行解一次单位下三角方程组得到第k行；交换后新的第k-1行
+    （原b_k）对前k-1行的系数不变，直接沿用，只重算r_kk。
+    检测到不稳定（非有限值、r_kk≤0、惰性约减不收敛）时只对该阶段用精确整数Gram-Schmidt重跑，
+    并刷新前k行的浮点数据。progress、cancel同lll_reduce（不提供势函数，log D传None）；取消时报告中cancelled为True。
+    实测只在60维以上、精确模式单阶段代价较高时快于lll_reduce_exact，背包格等需要频繁提升精度的格基上更慢，
+    小元素格基上约比lll_reduce慢一倍，因此没有接入GUI、批量脚本与基准测试，大整数格基请用lll_reduce_exact
+    返回 (约简后的格基(object整数数组), 交换次数, 报告)
+    """
+    b = _as_basis(B)
+    if b.dtype == np.float64:
+        raise ValueError("精确模式要求整数格基")
+    n = len(b)
+    G = _gram_matrix(b)
+    r = np.zeros((n, n))  # r_kj = μ_kj·‖b*_j‖²，r_kk = ‖b*_k‖²
+    mu = np.eye(n)
+    frac = Fraction(str(delta))
+    p, q = frac.numerator, frac.denominator
+    report = {"stages": 0, "escalations": 0, "escalated_rows": [], "cancelled": False}
+
+    def cholesky_row(k):
+        """由G的第k行求r、μ的第k行：r_k[:k] = L⁻¹·g（L为μ的前k行，单位下三角）"""
+        try:
+            g = G[k, :k + 1].astype(np.float64)
+        except OverflowError:
+            return False
+        if k:
+            r[k, :k] = np.linalg.solve(mu[:k, :k], g[:k])
+            mu[k, :k] = r[k, :k] / diag[:k]
+        r[k, k] = g[k] - mu[k, :k] @ r[k, :k]
+        return bool(np.isfinite(r[k, :k + 1]).all() and r[k, k] > 0)
+
+    def carried_row(k):
+        """第k行对前k行的系数已知（交换前的第k+1行），只由G_kk重算r_kk"""
+        try:
+            r[k, k] = float(G[k, k]) - mu[k, :k] @ r[k, :k]
+        except OverflowError:
+            return False
+        return bool(np.isfinite(r[k, k]) and r[k, k] > 0)
+
+    def float_stage(k, carried):
+        """浮点惰性尺寸约减；返回是否需要交换，不稳定时返回None"""
+        nonlocal b, G
+        prev = float("inf")
+        for _ in range(max_passes):
+            if not (carried_row(k) if carried else cholesky_row(k)):
+                return None
+            carried = False
+            largest = float(np.abs(mu[k, :k]).max()) if k else 0.0
+            if largest <= eta:
+                return delta * r[k - 1, k - 1] > r[k, k] + mu[k, k - 1] ** 2 * r[k - 1, k - 1]
+            if largest >= prev:  # 约减没有进展，精度不足
+                return None
+            prev = largest
+            idx, coeffs = _rounding_sweep(mu, k)
+            b = _subtract_rows(b, k, idx, coeffs)
+            G = _gram_subtract(G, k, idx, coeffs)
+        return None
+
+    def exact_stage(k):
+        """精确整数重跑：尺寸约减第k行并用精确值刷新前k+1行的浮点数据"""
+        nonlocal b, G
+        d, lam = _gram_integral_gso(G[:k + 1, :k + 1].tolist(), k + 1)
+        idx, coeffs = [], []
+        for l in range(k - 1, -1, -1):
+            if 2 * abs(lam[k][l]) > d[l + 1]:
+                c = (2 * lam[k][l] + d[l + 1]) // (2 * d[l + 1])  # 最近整数
+                lam[k][l] -= c * d[l + 1]
+                for i in range(l):
+                    lam[k][i] -= c * lam[l][i]
+                idx.append(l)
+                coeffs.append(c)
+        if idx:  # 各系数针对原b_k与b_l，一次作用即可
+            b = _subtract_rows(b, k, idx, coeffs)
+            G = _gram_subtract(G, k, idx, coeffs)
+        for i in range(k + 1):
+            r[i, i] = _ratio(d[i + 1], d[i])
+            for j in range(i):
+                mu[i, j] = _ratio(lam[i][j], d[j + 1])
+                r[i, j] = _ratio(lam[i][j], d[j])
+        return q * d[k + 1] * d[k - 1] < p * d[k] ** 2 - q * lam[k][k - 1] ** 2
+
+    swap_count = 0
+    diag = np.diagonal(r)  # r_jj的只读视图
+    carried = False
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):  # 溢出与非有限值由各阶段检查
+        cholesky_row(0)
+        k = 1
+        while k < n:
+            report["stages"] += 1
+            if (progress is not None or cancel is not None) and report["stages"] % _PROGRESS_INTERVAL == 0:
+                if cancel is not None and cancel.is_set():
+                    report["cancelled"] = True
+                    break
+                if progress is not None:
+                    progress(k, swap_count, None)
+            need_swap = float_stage(k, carried)
+            if need_swap is None:
+                report["escalations"] += 1
+                report["escalated_rows"].append(k)
+                need_swap = exact_stage(k)
+
+            carried = False
+            if need_swap:
+                b[[k - 1, k]] = b[[k, k - 1]]
+                G[[k - 1, k]] = G[[k, k - 1]]
+                G[:, [k - 1, k]] = G[:, [k, k - 1]]
+                swap_count += 1
+                if k > 1:
+                    r[k - 1, :k - 1] = r[k, :k - 1]
+                    mu[k - 1, :k - 1] = mu[k, :k - 1]
+                    carried = True
+                k = max(k - 1, 1)
+                if k == 1:
+                    cholesky_row(0)
+            else:
+                k += 1
+
+    return np.array(b, dtype=object), swap_count, report
+
+
+def _gram_matrix(b):
+    """精确Gram矩阵：可安全用int64时为int64数组（元素 < 2^62），否则为Python整数object数组"""
+    if b.dtype == np.int64 and b.shape[1] * int(np.max(np.abs(b), initial=0)) ** 2 < 2 ** 62:
+        return b @ b.T
+    rows = b.astype(object)
+    return rows @ rows.T
+
+
+def _gram_subtract(G, k, idx, coeffs):
+    """b_k -= Σ x_j·b_j 之后增量更新Gram矩阵的第k行与第k列：g = G_k - x·G，G_kk = g_k - x·g[idx]
+
+    int64可能溢出时先转为object数组。返回（可能是新的）G
+    """
+    if G.dtype == np.int64:
+        total = sum(abs(c) for c in coeffs)
+        bound = total * int(np.max(np.abs(G[idx]))) + int(np.max(np.abs(G[k])))
+        if bound * (total + 1) >= 2 ** 62:
+            G = G.astype(object)
+    x = np.array(coeffs, dtype=G.dtype)
+    g = G[k] - x @ G[idx]
+    g[k] -= x @ g[idx]
+    G[k] = g
+    G[:, k] = g
+    return G
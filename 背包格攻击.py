@@ -0,0 +1,337 @@
+"""子集和（背包）问题的格攻击：构造格基、从约简结果中提取0/1解
+
+支持两种嵌入：Lagarias–Odlyzko（解向量为0/1）与Coster等人（CJLOSS）的±1/2嵌入
+（目标行各分量为1/2，整体乘2后解向量为±1，范数更短，可攻击密度更高的实例）
+
+不依赖tkinter，背包问题GUI、基准测试与批处理脚本共用
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Manager
+
+import numpy as np
+
+from 格基约简 import CANCELLED, lll_reduce, lll_reduce_exact, randomize_basis
+
+
+EMBEDDINGS = ("lo", "cjloss")
+
+
+def construct_lattice(weights, target, embedding="lo", N=None):
+    """构造用于求解子集和问题的格基矩阵
+
+    embedding="lo"：b_i = (e_i, N·w_i)，目标行 (0, ..., 0, -N·t)，解向量 (x, 0)
+    embedding="cjloss"：b_i = (2e_i, N·w_i)，目标行 (1, ..., 1, N·t)，
+    解向量 Σ x_i·b_i - 目标行 = (2x - 1, 0)，各分量为±1
+    N默认取 2·max(max w, t)；批量求解时各目标共用同一个N
+    """
+    if embedding not in EMBEDDINGS:
+        raise ValueError(f"未知的嵌入方式: {embedding}")
+    n = len(weights)
+    N = N or 2 * max(max(weights), target)  # 选择合适的N值
+    integral = all(isinstance(x, (int, np.integer)) for x in list(weights) + [target])
+    B = np.zeros((n + 1, n + 1), dtype=object if integral else np.float64)  # 整数输入保持Python整数
+    scale = 2 if embedding == "cjloss" else 1
+    for i in range(n):
+        B[i, i] = scale
+        B[i, -1] = N * weights[i]
+    if embedding == "cjloss":
+        B[-1, :-1] = 1
+        B[-1, -1] = N * target
+    else:
+        B[-1, :-1] = 0
+        B[-1, -1] = -N * target
+    return B
+
+
+def _to_binary(row, n):
+    """前n个分量全为0/1（或全为0/-1，即解向量的相反向量）时返回0/1列表，否则返回None"""
+    eps = 1e-6
+    sign = 0
+    solution = []
+    for i in range(n):
+        if abs(row[i]) < eps:
+            solution.append(0)
+        elif sign == 0 and abs(abs(row[i]) - 1) < eps:
+            sign = 1 if row[i] > 0 else -1
+            solution.append(1)
+        elif abs(row[i] - sign) < eps:
+            solution.append(1)
+        else:
+            return None
+    return solution if sign else None
+
+
+def _to_signs(row, n):
+    """前n个分量全为±1时返回对应的0/1列表 (1+r)/2，否则返回None"""
+    eps = 1e-6
+    solution = []
+    for i in range(n):
+        if abs(row[i] - 1) < eps:
+            solution.append(1)
+        elif abs(row[i] + 1) < eps:
+            solution.append(0)
+        else:
+            return None
+    return solution
+
+
+def decode_solution(row, weights, target):
+    """把约简结果中的一行解码为子集和的0/1解，不是解时返回None
+
+    0/1行（LO嵌入，可能整体取反）与±1行（CJLOSS嵌入，(1+r)/2与(1-r)/2互为补集）都尝试其补集，
+    返回重量和恰为target的那一个
+    """
+    if abs(row[-1]) >= 1e-6:  # 绝大多数行在这里就被排除
+        return None
+    n = len(weights)
+    solution = _to_binary(row, n)
+    if solution is None:
+        solution = _to_signs(row, n)
+    if solution is None:
+        return None
+    for candidate in (solution, [1 - x for x in solution]):
+        if sum(w for w, x in zip(weights, candidate) if x) == target:
+            return candidate
+    return None
+
+
+def find_solution(reduced, weights, target=None):
+    """从约减后的格基矩阵中寻找子集和问题的解
+
+    给出target时用decode_solution识别0/1、±1行及其补集并校验重量和；
+    否则只识别0/1行（解向量可能整体取反），不做校验
+    """
+    n = len(weights)
+    for row in reduced:
+        if target is not None:
+            solution = decode_solution(row, weights, target)
+        elif abs(row[-1]) < 1e-6:
+            solution = _to_binary(row, n)
+        else:
+            solution = None
+        if solution is not None:
+            return solution
+    return None
+
+
+def solution_predicate(weights, target):
+    """约简的提前结束判据：行向量可解码为 Σ w_i·x_i = target 的0/1解时为真（两种嵌入均适用）"""
+
+    def is_solution(row):
+        return decode_solution(row, weights, target) is not None
+
+    return is_solution
+
+
+def solve_subset_sum(weights, target, delta=0.99, exact=False, embedding="lo", cancel=None, report=None):
+    """LLL求解子集和：目标行放在最前，约简中一出现解向量就停止
+
+    目标行在前时解向量更常出现在某个中间格基里（之后可能又被组合掉），所以成功率比按原始行序约简高；
+    但这并不更快：精确模式下解向量一般在约简接近结束时才出现，stop_when几乎不会提前触发，
+    交换次数与耗时反而比按原始行序的完整约简多一到两成。
+    浮点约简因精度不足中止且未找到解时，按原始行序重新约简一次。embedding见construct_lattice，cancel同lll_reduce。
+    report(LLLStatus, 是否为按原始行序的重试)在每次浮点约简后被调用，供GUI显示约简过程。
+    返回 (0/1解或None, 约简后的格基, 交换次数)
+    """
+    is_solution = solution_predicate(weights, target)
+    B = np.roll(construct_lattice(weights, target, embedding), 1, axis=0)
+    if exact:
+        reduced, swaps = lll_reduce_exact(B, delta, cancel=cancel, stop_when=is_solution)
+    else:
+        reduced, status = lll_reduce(B, delta, cancel=cancel, stop_when=is_solution)
+        swaps = status.swaps
+        if report is not None:
+            report(status, False)
+        if status.stopped_at is None and not status.reduced and not (cancel is not None and cancel.is_set()):
+            reduced, status = lll_reduce(construct_lattice(weights, target, embedding), delta, cancel=cancel,
+                                         stop_when=is_solution)
+            swaps += status.swaps
+            if report is not None:
+                report(status, True)
+
+    return find_solution(reduced, weights, target), reduced, swaps
+
+
+def reduce_weight_sublattice(weights, N, embedding="lo", delta=0.99, exact=False):
+    """约简不含目标行的权重子格（construct_lattice的前n行），同一组重量下的所有目标共用
+
+    返回约简后的n行（秩为n，维数n+1）
+    """
+    rows = construct_lattice(weights, 0, embedding, N)[:-1]
+    if exact:
+        reduced, _ = lll_reduce_exact(rows, delta)
+    else:
+        reduced, _ = lll_reduce(rows, delta)
+    return reduced
+
+
+def _solve_with_sublattice(args):
+    """在子进程中求解一个目标：约简好的权重子格后追加目标行，从第n行开始增量约简"""
+    sublattice, weights, target, N, embedding, delta, exact = args
+    n = len(weights)
+    is_solution = solution_predicate(weights, target)
+    target_row = construct_lattice(weights, target, embedding, N)[-1:]
+    B = np.vstack([np.asarray(sublattice, dtype=object), target_row])
+    if exact:
+        reduced, swaps = lll_reduce_exact(B, delta, stop_when=is_solution, start=n)
+    else:
+        reduced, status = lll_reduce(B, delta, stop_when=is_solution, start=n)
+        swaps = status.swaps
+        if status.stopped_at is None and not status.reduced:  # 浮点精度不足，回退到整体求解
+            solution, _, more = solve_subset_sum(weights, target, delta, exact, embedding)
+            return solution, swaps + more
+    return find_solution(reduced, weights, target), swaps
+
+
+class BatchStatus:
+    """批量求解统计：预约简权重子格与逐目标求解的耗时、交换次数、吞吐量（目标数/秒）"""
+
+    def __init__(self):
+        self.targets = 0
+        self.solved = 0
+        self.swaps = 0
+        self.workers = 1
+        self.sublattice_time = 0.0
+        self.solve_time = 0.0
+
+    @property
+    def throughput(self):
+        total = self.sublattice_time + self.solve_time
+        return self.targets / total if total > 0 else 0.0
+
+
+def solve_subset_sum_batch(weights, targets, delta=0.99, exact=False, embedding="lo", workers=1):
+    """同一组重量（如同一Merkle–Hellman公钥）下批量求解多个目标
+
+    权重子格只约简一次；每个目标只追加目标行并从第n行开始增量约简（满足stop_when即停止），
+    workers>1时各目标在进程池中并行求解。返回 (与targets对应的0/1解或None列表, BatchStatus)
+    """
+    status = BatchStatus()
+    status.targets = len(targets)
+    status.workers = workers
+    if not targets:
+        return [], status
+    N = 2 * max(max(weights), max(targets))  # 所有目标共用N，子格才能共享
+
+    start = time.perf_counter()
+    sublattice = reduce_weight_sublattice(weights, N, embedding, delta, exact)
+    status.sublattice_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tasks = [(sublattice, weights, target, N, embedding, delta, exact) for target in targets]
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(_solve_with_sublattice, tasks,
+                                        chunksize=max(1, len(tasks) // (4 * workers))))
+    else:
+        results = [_solve_with_sublattice(task) for task in tasks]
+    status.solve_time = time.perf_counter() - start
+
+    solutions = [solution for solution, _ in results]
+    status.swaps = sum(swaps for _, swaps in results)
+    status.solved = sum(solution is not None for solution in solutions)
+    return solutions, status
+
+
+class _Deadline:
+    """按截止时间置位的取消标志，可作为约简函数的cancel参数（跨进程共享同一个墙钟截止时刻）
+
+    event给出时（如Manager().Event()的代理）它被置位也视为取消，用于其他进程已找到解时停止
+    """
+
+    def __init__(self, deadline, event=None):
+        self.deadline = deadline
+        self.event = event
+
+    def is_set(self):
+        return (self.deadline is not None and time.time() >= self.deadline) or \
+            (self.event is not None and self.event.is_set())
+
+
+def _restart_task(args):
+    """在子进程中用一个随机种子重新约简：随机化格基后LLL，出现解向量、到达截止时间或found被置位即停止
+
+    浮点约简因精度不足中止（未取消、未找到解）时改用精确整数约简重跑同一个随机化格基
+    """
+    weights, target, delta, exact, embedding, seed, deadline, found = args
+    is_solution = solution_predicate(weights, target)
+    B = randomize_basis(construct_lattice(weights, target, embedding), np.random.default_rng(seed))
+    cancel = _Deadline(deadline, found)
+    if not exact:
+        reduced, status = lll_reduce(B, delta, cancel=cancel, stop_when=is_solution)
+        exact = status.stopped_at is None and not status.reduced and status.reason != CANCELLED
+    if exact:
+        reduced, _ = lll_reduce_exact(B, delta, cancel=cancel, stop_when=is_solution)
+    return seed, find_solution(reduced, weights, target)
+
+
+class RestartStatus:
+    """随机重启统计：完成的尝试次数、给出解的种子（None表示首次约简即成功或未找到）、总耗时、是否超时或被取消"""
+
+    def __init__(self):
+        self.attempts = 0
+        self.seed = None
+        self.elapsed = 0.0
+        self.timed_out = False
+        self.cancelled = False
+
+
+def solve_subset_sum_restarts(weights, target, delta=0.99, exact=False, embedding="lo", seeds=8, workers=1,
+                              time_budget=None, seed=0, initial=True, cancel=None):
+    """先按solve_subset_sum求解；失败时用seeds个随机种子随机化格基后重新约简，返回最先找到的解
+
+    各种子在进程池中并行（workers>1时）；找到解、time_budget秒到达或cancel（如threading.Event，
+    供GUI在后台线程中调用时取消）被置位后，仍在运行的约简经共享的Event（或截止时间）停止，未开始的取消。
+    initial=False时跳过首次约简（调用方已经尝试过）。
+    返回 (0/1解或None, RestartStatus)
+    """
+    status = RestartStatus()
+    start = time.time()
+    deadline = start + time_budget if time_budget is not None else None
+    stop = _Deadline(deadline, cancel)
+    solution = None
+    if initial:
+        solution, _, _ = solve_subset_sum(weights, target, delta, exact, embedding, cancel=stop)
+        status.attempts = 1
+    if solution is not None or seeds <= 0 or stop.is_set():
+        return solution, _finish_restarts(status, solution, start, deadline, cancel)
+
+    if workers > 1:
+        with Manager() as manager:
+            found = manager.Event()
+            tasks = [(weights, target, delta, exact, embedding, seed + i, deadline, found) for i in range(seeds)]
+            executor = ProcessPoolExecutor(workers)
+            try:
+                pending = {executor.submit(_restart_task, task) for task in tasks}
+                while pending and solution is None and not stop.is_set():
+                    done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)  # 定期检查cancel
+                    for future in done:
+                        status.attempts += 1
+                        status.seed, solution = future.result()
+                        if solution is not None:
+                            break
+            finally:
+                found.set()  # 运行中的任务在下一次检查cancel时停止，之后才能关闭manager
+                executor.shutdown(wait=True, cancel_futures=True)
+    else:
+        tasks = [(weights, target, delta, exact, embedding, seed + i, deadline, cancel) for i in range(seeds)]
+        for task in tasks:
+            if stop.is_set():
+                break
+            status.attempts += 1
+            status.seed, solution = _restart_task(task)
+            if solution is not None:
+                break
+
+    return solution, _finish_restarts(status, solution, start, deadline, cancel)
+
+
+def _finish_restarts(status, solution, start, deadline, cancel):
+    """填写RestartStatus的结束信息：未找到解时区分被取消与超时"""
+    if solution is None:
+        status.seed = None
+        status.cancelled = cancel is not None and cancel.is_set()
+        status.timed_out = not status.cancelled and _Deadline(deadline).is_set()
+    status.elapsed = time.time() - start
+    return status